@@ -5,9 +5,11 @@ import platform
 import numpy
 import subprocess
 import tempfile
+from time import time
 from ..bin import pyluxcore
 from .. import utils
 from ..utils import pfm
+from ..export.aovs import get_viewport_denoiser_imgpipeline_props
 from shutil import which
 
 NULL = 0
@@ -49,6 +51,7 @@ class FrameBuffer(object):
         self._border = utils.calc_blender_border(scene, context)
         self._offset_x, self._offset_y = self._calc_offset(context, scene, self._border)
         self._pixel_size = int(scene.luxcore.viewport.pixel_size)
+        self._use_half_float = scene.luxcore.viewport.use_half_float
 
         if utils.is_valid_camera(scene.camera) and not utils.in_material_shading_mode(context):
             pipeline = scene.camera.data.luxcore.imagepipeline
@@ -65,7 +68,16 @@ class FrameBuffer(object):
             self._buffertype = bgl.GL_RGB
             self._output_type = pyluxcore.FilmOutputType.RGB_IMAGEPIPELINE
 
-        self.buffer = bgl.Buffer(bgl.GL_FLOAT, [self._width * self._height * bufferdepth])
+        buffer_size = self._width * self._height * bufferdepth
+        # Double buffering: the film is fetched and uploaded into one buffer/texture
+        # while the other one (the front) is drawn
+        self._buffers = [bgl.Buffer(bgl.GL_FLOAT, [buffer_size]) for _ in range(2)]
+        self._front = 0
+        if self._use_half_float:
+            # Conversion target for uploads with half the bandwidth
+            self._half_buffer = bgl.Buffer(bgl.GL_SHORT, [buffer_size])
+        else:
+            self._half_buffer = None
         self._init_opengl(engine, scene)
 
         # Denoiser
@@ -79,13 +91,34 @@ class FrameBuffer(object):
             path=os.path.join(current_dir, "bin")+os.pathsep+os.environ["PATH"]
         )
         self._denoiser_process = None
+        # Session and imagepipeline index of the in-process denoiser while it is running
+        self._denoiser_session = None
+        self._denoiser_pipeline_index = None
         self.denoiser_result_cached = False
+        # True if the session was paused to run the in-process denoiser, it is resumed afterwards
+        self._denoiser_paused_session = False
+        # Scheduling of the periodic denoiser while rendering.
+        # How long the last run of the in-process denoiser took, in seconds
+        self.denoiser_last_elapsed_time = 0
+        self._denoiser_start_time = 0
+        self._denoiser_last_end_time = time()
+        self._denoiser_last_samples = 0
+        # Time of the last user edit and the time between the last two edits
+        self._last_edit_time = 0
+        self._edit_interval = float("inf")
+
+    @property
+    def buffer(self):
+        """ The buffer that is filled and uploaded next """
+        return self._buffers[1 - self._front]
 
     def _init_opengl(self, engine, scene):
-        # Create texture
-        self.texture = bgl.Buffer(bgl.GL_INT, 1)
-        bgl.glGenTextures(1, self.texture)
-        self.texture_id = self.texture[0]
+        # Create textures, their storage is allocated once and only updated afterwards
+        self.textures = bgl.Buffer(bgl.GL_INT, 2)
+        bgl.glGenTextures(2, self.textures)
+        self._allocate_textures()
+        # The mag filter of each texture, only changed if the setting changes
+        self._mag_filters = [None, None]
 
         # Bind shader that converts from scene linear to display space,
         # use the scene's color management settings.
@@ -136,7 +169,7 @@ class FrameBuffer(object):
         bgl.glDeleteBuffers(2, self.vertex_buffer)
         bgl.glDeleteVertexArrays(1, self.vertex_array)
         bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
-        bgl.glDeleteTextures(1, self.texture)
+        bgl.glDeleteTextures(2, self.textures)
 
     def needs_replacement(self, context, scene):
         if (self._width, self._height) != utils.calc_filmsize(scene, context):
@@ -155,6 +188,8 @@ class FrameBuffer(object):
             return True
         if self._pixel_size != int(scene.luxcore.viewport.pixel_size):
             return True
+        if self._use_half_float != scene.luxcore.viewport.use_half_float:
+            return True
         return False
 
     def _make_denoiser_filepath(self, name):
@@ -162,14 +197,33 @@ class FrameBuffer(object):
 
     def _save_denoiser_AOV(self, luxcore_session, film_output_type, path):
         # Bufferdepth always 3 because denoiser can't handle alpha anyway (maybe copy over alpha channel in the future)
-        np_buffer = numpy.zeros((self._height, self._width, 3), dtype="float32")
-        luxcore_session.GetFilm().GetOutputFloat(film_output_type, np_buffer)
         TempfileManager.track(id(self), path)
-        with open(path, "w+b") as f:
-            utils.pfm.save_pfm(f, np_buffer)
+        # The film is written directly into the file
+        np_buffer = pfm.create_pfm_memmap(path, self._width, self._height)
+        luxcore_session.GetFilm().GetOutputFloat(film_output_type, np_buffer)
+        np_buffer.flush()
+        del np_buffer
+
+    def start_denoiser(self, luxcore_session, context, scene, pipeline_index=None):
+        """
+        Denoise the current film without blocking. If the session has a denoiser imagepipeline
+        (pipeline_index is not None), the OIDN plugin of LuxCore is executed asynchronously.
+        Otherwise, the AOVs are saved to disk and the external oidnDenoise binary is used.
+        """
+        if pipeline_index is not None:
+            # The session must not render while the imagepipeline is parsed and executed
+            if not luxcore_session.IsInPause():
+                luxcore_session.Pause()
+                self._denoiser_paused_session = True
+            # Update the imagepipeline, the settings might have changed since the export
+            luxcore_session.Parse(get_viewport_denoiser_imgpipeline_props(context, scene, pipeline_index))
+            luxcore_session.GetFilm().AsyncExecuteImagePipeline(pipeline_index)
+            self._denoiser_start_time = time()
+            self._denoiser_session = luxcore_session
+            self._denoiser_pipeline_index = pipeline_index
+            return
 
-    def start_denoiser(self, luxcore_session):
-        if not os.path.exists(self._denoiser_path):
+        if not self._denoiser_path or not os.path.exists(self._denoiser_path):
             raise Exception("Binary not found. Download it from "
                             "https://github.com/OpenImageDenoise/oidn/releases")
         if self._transparent:
@@ -191,34 +245,104 @@ class FrameBuffer(object):
         self._denoiser_process = subprocess.Popen(args)
 
     def is_denoiser_active(self):
-        return self._denoiser_process is not None
+        return self._denoiser_process is not None or self._denoiser_session is not None
 
     def is_denoiser_done(self):
+        if self._denoiser_session:
+            return self._denoiser_session.GetFilm().HasDoneAsyncExecuteImagePipeline()
         return self._denoiser_process.poll() is not None
 
     def load_denoiser_result(self, scene):
+        if self._denoiser_session:
+            session = self._denoiser_session
+            self._denoiser_session = None
+            # Copy the result into the read buffer without executing the imagepipeline again
+            session.GetFilm().GetOutputFloat(self._output_type, self.buffer, self._denoiser_pipeline_index, False)
+            self._upload(scene)
+            self.denoiser_result_cached = True
+            self._resume_paused_session(session)
+
+            now = time()
+            self.denoiser_last_elapsed_time = now - self._denoiser_start_time
+            self._denoiser_last_end_time = now
+            return
+
         self._denoiser_process = None
-        shape = (self._height * self._width * 3)
         try:
-            with open(self._denoised_file_path, "rb") as f:
-                data, scale = utils.pfm.load_pfm(f)
-            TempfileManager.delete_files(id(self))
+            data, scale = pfm.load_pfm_memmap(self._denoised_file_path)
         except FileNotFoundError:
             TempfileManager.delete_files(id(self))
             raise Exception("Denoising failed, check console for details")
 
+        # Copy the result (and the alpha) into the buffer without intermediate arrays
+        bufferdepth = 4 if self._transparent else 3
+        pixels = numpy.frombuffer(self.buffer, dtype=numpy.float32).reshape(self._height, self._width, bufferdepth)
+        pixels[:, :, :3] = data
         if self._transparent:
-            shape = (self._height * self._width * 4)
-            data = numpy.concatenate((data,self._alpha), axis=2)
+            pixels[:, :, 3:] = self._alpha
+        # The file can only be deleted on all platforms after it is unmapped
+        del data
+        TempfileManager.delete_files(id(self))
 
-        data = numpy.resize(data, shape)
-        self.buffer[:] = data
-        self._update_texture(scene)
+        self._upload(scene)
         self.denoiser_result_cached = True
 
+    def _resume_paused_session(self, luxcore_session):
+        if self._denoiser_paused_session and luxcore_session.IsInPause():
+            luxcore_session.Resume()
+        self._denoiser_paused_session = False
+
+    def is_session_paused_by_denoiser(self):
+        return self._denoiser_paused_session
+
+    def start_periodic_denoiser(self, luxcore_session, context, scene, pipeline_index, samples):
+        """ Start the in-process denoiser, the session is paused until the result is loaded """
+        self._denoiser_last_samples = samples
+        self.start_denoiser(luxcore_session, context, scene, pipeline_index)
+
+    def is_periodic_denoiser_due(self, viewport_settings, samples):
+        """
+        Returns True if the periodic denoiser should be started now. Runs are delayed if the
+        denoiser would use more than the allowed share of the wall time, based on the duration of the last run.
+        """
+        if samples <= self._denoiser_last_samples:
+            # No new samples since the last run
+            return False
+
+        now = time()
+        # A running imagepipeline can't be cancelled, the next edit would have to wait for it.
+        # Skip runs while the user edits the scene faster than the denoiser finishes.
+        if now - self._last_edit_time <= self._edit_interval < self.denoiser_last_elapsed_time:
+            return False
+
+        elapsed_since_last = now - self._denoiser_last_end_time
+        max_share = viewport_settings.denoise_max_time_share / 100
+        if elapsed_since_last < self.denoiser_last_elapsed_time * (1 / max_share - 1):
+            return False
+
+        if viewport_settings.denoise_cadence == "SAMPLES":
+            return samples - self._denoiser_last_samples >= viewport_settings.denoise_interval_samples
+        return elapsed_since_last >= viewport_settings.denoise_interval_time
+
     def reset_denoiser(self):
         """ Denoiser was not started yet or the user has triggered an update """
         self.denoiser_result_cached = False
+        now = time()
+        self._edit_interval = now - self._last_edit_time
+        self._last_edit_time = now
+        # The cadence of the periodic denoiser starts again
+        self._denoiser_last_end_time = now
+        self._denoiser_last_samples = 0
+
+        if self._denoiser_session:
+            # The result is stale, discard it. A running imagepipeline can't be interrupted,
+            # but it has to finish before the session is edited
+            film = self._denoiser_session.GetFilm()
+            if not film.HasDoneAsyncExecuteImagePipeline():
+                print("Waiting for denoiser")
+                film.WaitAsyncExecuteImagePipeline()
+            self._resume_paused_session(self._denoiser_session)
+            self._denoiser_session = None
 
         if self._denoiser_process:
             print("Interrupting denoiser")
@@ -228,7 +352,7 @@ class FrameBuffer(object):
 
     def update(self, luxcore_session, scene):
         luxcore_session.GetFilm().GetOutputFloat(self._output_type, self.buffer)
-        self._update_texture(scene)
+        self._upload(scene)
 
     def draw(self, engine, context, scene):
         if self._transparent:
@@ -238,7 +362,7 @@ class FrameBuffer(object):
         engine.bind_display_space_shader(scene)
 
         bgl.glActiveTexture(bgl.GL_TEXTURE0)
-        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.texture_id)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.textures[self._front])
         bgl.glBindVertexArray(self.vertex_array[0])
         bgl.glDrawArrays(bgl.GL_TRIANGLE_FAN, 0, 4)
         bgl.glBindVertexArray(NULL)
@@ -253,26 +377,56 @@ class FrameBuffer(object):
         if self._transparent:
             bgl.glDisable(bgl.GL_BLEND)
 
-    def _update_texture(self, scene):
+    def _allocate_textures(self):
         if self._transparent:
-            gl_format = bgl.GL_RGBA
-            internal_format = bgl.GL_RGBA32F
+            self._gl_format = bgl.GL_RGBA
+            internal_format = bgl.GL_RGBA16F if self._use_half_float else bgl.GL_RGBA32F
         else:
-            gl_format = bgl.GL_RGB
-            internal_format = bgl.GL_RGB32F
+            self._gl_format = bgl.GL_RGB
+            internal_format = bgl.GL_RGB16F if self._use_half_float else bgl.GL_RGB32F
+        self._gl_type = bgl.GL_HALF_FLOAT if self._use_half_float else bgl.GL_FLOAT
 
         bgl.glActiveTexture(bgl.GL_TEXTURE0)
-        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.texture_id)
-        bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, internal_format, self._width, self._height,
-                         0, gl_format, bgl.GL_FLOAT, self.buffer)
-        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_EDGE)
-        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_EDGE)
+        for texture_id in self.textures:
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, texture_id)
+            bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, internal_format, self._width, self._height,
+                             0, self._gl_format, self._gl_type, None)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_EDGE)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_EDGE)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_NEAREST)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, NULL)
+
+    def _upload(self, scene):
+        """ Upload the back buffer into its texture, then make it the front """
+        back = 1 - self._front
+
+        if self._half_buffer is not None:
+            # Both bgl buffers support the buffer protocol, so numpy can convert without copies in Python
+            pixels = numpy.frombuffer(self.buffer, dtype=numpy.float32)
+            half_pixels = numpy.frombuffer(self._half_buffer, dtype=numpy.float16)
+            numpy.copyto(half_pixels, pixels, casting="same_kind")
+            data = self._half_buffer
+            # Rows of half float RGB images are not always aligned to 4 bytes
+            bgl.glPixelStorei(bgl.GL_UNPACK_ALIGNMENT, 2)
+        else:
+            data = self.buffer
+
+        bgl.glActiveTexture(bgl.GL_TEXTURE0)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.textures[back])
+        bgl.glTexSubImage2D(bgl.GL_TEXTURE_2D, 0, 0, 0, self._width, self._height,
+                            self._gl_format, self._gl_type, data)
 
-        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_NEAREST)
         mag_filter = bgl.GL_NEAREST if scene.luxcore.viewport.mag_filter == "NEAREST" else bgl.GL_LINEAR
-        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, mag_filter)
+        if self._mag_filters[back] != mag_filter:
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, mag_filter)
+            self._mag_filters[back] = mag_filter
         bgl.glBindTexture(bgl.GL_TEXTURE_2D, NULL)
 
+        if self._half_buffer is not None:
+            bgl.glPixelStorei(bgl.GL_UNPACK_ALIGNMENT, 4)
+
+        self._front = back
+
     def _calc_offset(self, context, scene, border):
         region_size = context.region.width, context.region.height
         view_camera_offset = list(context.region_data.view_camera_offset)
@@ -312,3 +466,4 @@ class FrameBuffer(object):
 
     def _cam_border_offset(self, aspect, base, border_min, region_width, view_camera_offset, zoom):
         return (0.5 - 2 * zoom * view_camera_offset) * region_width + aspect * base * (2 * border_min - 1)
+
@@ -57,6 +57,8 @@ class LuxCoreRenderEngine(bpy.types.RenderEngine):
     def __del__(self):
         # Note: this method is also called when unregister() is called (for some reason I don't understand)
         try:
+            if getattr(self, "framebuffer", None):
+                self.framebuffer.reset_denoiser()
             if getattr(self, "session", None):
                 if not self.is_preview:
                     print("[Engine] del: stopping session")
@@ -99,6 +101,8 @@ class LuxCoreRenderEngine(bpy.types.RenderEngine):
             # Clean up
             del self.session
             self.session = None
+            # Never try to reuse a scene from a failed render in the next frame
+            self.exporter = None
         finally:
             utils_view_layer.State.reset()
             LuxCoreRenderEngine.final_running = False
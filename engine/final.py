@@ -6,6 +6,8 @@ from ..utils.errorlog import LuxCoreErrorLog
 from ..utils import view_layer as utils_view_layer
 from ..properties.denoiser import LuxCoreDenoiser
 from ..properties.display import LuxCoreDisplaySettings
+from ..properties.halt import LuxCoreHaltConditions
+from ..properties.imagepipeline import LuxCoreImagepipeline
 
 
 def render(engine, depsgraph):
@@ -55,14 +57,24 @@ def render(engine, depsgraph):
     
 
 def _render_layer(engine, depsgraph, statistics, view_layer):
-    engine.reset()
-    engine.exporter = export.Exporter(statistics)
-    engine.session = engine.exporter.create_session(depsgraph, engine=engine, view_layer=view_layer)
     scene = depsgraph.scene_eval
 
+    if _can_reuse_exporter(engine, view_layer) and engine.exporter.can_update_animation_frame(depsgraph):
+        # Only apply the changes of this frame to the scene kept from the last frame
+        engine.framebuffer = None
+        engine.aov_imagepipelines = {}
+        engine.exporter.stats = statistics
+        engine.session = engine.exporter.update_animation_frame(depsgraph, engine)
+    else:
+        engine.reset()
+        engine.exporter = export.Exporter(statistics, _use_persistent_animation(engine, scene))
+        engine.session = engine.exporter.create_session(depsgraph, engine=engine, view_layer=view_layer)
+
     if engine.session is None:
         # session is None, but no error was thrown
         print("[Engine/Final] Export cancelled by user.")
+        # The scene might be incomplete, it can't be re-used for the next frame
+        engine.exporter = None
         return
 
     engine.framebuffer = FrameBufferFinal(scene)
@@ -122,9 +134,15 @@ def _render_layer(engine, depsgraph, statistics, view_layer):
             if engine.session.IsInPause():
                 engine.session.Resume()
 
-        # Do session update (imagepipeline, lightgroups)
-        changes = engine.exporter.get_changes(depsgraph)
-        engine.exporter.update_session(changes, engine.session)
+        # Do session update (imagepipeline, lightgroups, halt conditions), only if the user changed something
+        if LuxCoreImagepipeline.changed or LuxCoreHaltConditions.changed:
+            # Reset before the update, so changes made in the meantime are not lost
+            LuxCoreImagepipeline.changed = False
+            LuxCoreHaltConditions.changed = False
+            changes = engine.exporter.get_changes(depsgraph)
+            engine.exporter.update_session(changes, engine.session)
+        else:
+            changes = export.Change.NONE
 
         if engine.session.IsInPause():
             if changes or manual_refresh_requested:
@@ -190,6 +208,32 @@ def _render_layer(engine, depsgraph, statistics, view_layer):
     engine.session = None
 
 
+def _use_persistent_animation(engine, scene):
+    """
+    Check if the LuxCore scene can be kept alive between the frames of an animation.
+    This requires Blender's persistent data option, which keeps the engine instance alive.
+    """
+    if not engine.is_animation or not scene.render.use_persistent_data:
+        return False
+
+    if scene.luxcore.config.use_filesaver:
+        return False
+
+    # Motion blur is exported by stepping through the frames, which can't be done incrementally
+    if utils.is_valid_camera(scene.camera) and scene.camera.data.luxcore.motion_blur.enable:
+        return False
+
+    # The scene is only kept for one render layer
+    enabled_layers = [layer for layer in scene.view_layers if layer.use]
+    return len(enabled_layers) == 1
+
+
+def _can_reuse_exporter(engine, view_layer):
+    exporter = engine.exporter
+    return (engine.is_animation and exporter is not None and exporter.persistent_animation
+            and exporter.view_layer_name == view_layer.name)
+
+
 def _stat_refresh_interval(start, scene):
     width, height = utils_render.calc_filmsize(scene)
     is_big_image = width * height > 2000 * 2000
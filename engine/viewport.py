@@ -51,6 +51,7 @@ def view_update(engine, context, depsgraph, changes=None):
             print("=" * 50)
             print("[Engine/Viewport] New session")
             engine.exporter = export.Exporter()
+            engine.aov_imagepipelines = {}
             engine.session = engine.exporter.create_session(depsgraph, context, engine=engine)
             # Start in separate thread to avoid blocking the UI
             engine.starting_session = True
@@ -76,12 +77,13 @@ def view_update(engine, context, depsgraph, changes=None):
 
     if changes:
         s = time()
+        if engine.framebuffer:
+            # Also waits for a running denoiser, it has to finish before the session is edited
+            engine.framebuffer.reset_denoiser()
+
         # We have to re-assign the session because it might have been replaced due to filmsize change
         engine.session = engine.exporter.update(depsgraph, context, engine.session, changes)
         engine.viewport_start_time = time()
-
-        if engine.framebuffer:
-            engine.framebuffer.reset_denoiser()
         print("view_update(): applying changes took %.1f ms" % ((time() - s) * 1000))
     print("view_update() took %.1f ms" % ((time() - start) * 1000))
 
@@ -136,6 +138,8 @@ def view_draw(engine, context, depsgraph):
 
     if not engine.framebuffer or engine.framebuffer.needs_replacement(context, scene):
         print("new framebuffer")
+        if engine.framebuffer:
+            engine.framebuffer.reset_denoiser()
         engine.framebuffer = FrameBuffer(engine, context, scene)
 
     framebuffer = engine.framebuffer
@@ -156,6 +160,7 @@ def view_draw(engine, context, depsgraph):
         # We have to re-assign the session because it might have been
         # replaced due to filmsize change.
         s = time()
+        framebuffer.reset_denoiser()
         engine.session = engine.exporter.update(depsgraph, context, engine.session, export.Change.CAMERA)
         engine.viewport_start_time = time()
         # print("view_draw(): camera update took %.1f ms" % ((time() - s) * 1000))
@@ -181,11 +186,19 @@ def view_draw(engine, context, depsgraph):
     # Check if we need to pause the viewport render
     # (note: the LuxCore stat "stats.renderengine.time" is not reliable here)
     rendered_time = time() - engine.viewport_start_time
-    halt_time = scene.luxcore.viewport.halt_time
+    viewport = scene.luxcore.viewport
+    halt_time = viewport.halt_time
     status_message = ""
+    denoiser_pipeline_index = engine.aov_imagepipelines.get(engine.DENOISED_OUTPUT_NAME)
+    # Only the in-process denoiser is fast enough to run while rendering
+    periodic_denoise = viewport.denoise and viewport.periodic_denoise and denoiser_pipeline_index is not None
 
     if rendered_time > halt_time:
-        if not engine.session.IsInPause():
+        # The session might only be paused for a periodic denoiser run
+        if not engine.session.IsInPause() or framebuffer.is_session_paused_by_denoiser():
+            if periodic_denoise or framebuffer.is_session_paused_by_denoiser():
+                # The last periodic result does not contain the latest samples
+                framebuffer.reset_denoiser()
             print("[Engine/Viewport] Pausing session")
             engine.session.Pause()
         status_message = "(Paused)"
@@ -202,10 +215,18 @@ def view_draw(engine, context, depsgraph):
                     engine.tag_redraw()
             elif context.scene.luxcore.viewport.denoise:
                 try:
-                    framebuffer.start_denoiser(engine.session)
+                    framebuffer.start_denoiser(engine.session, context, scene, denoiser_pipeline_index)
                     engine.tag_redraw()
                 except Exception as error:
                     status_message = "Could not start denoiser: %s" % error
+    elif periodic_denoise and framebuffer.is_denoiser_active():
+        # The session is paused while the denoiser imagepipeline runs
+        if framebuffer.is_denoiser_done():
+            framebuffer.load_denoiser_result(scene)
+            status_message = "(Denoised)"
+        else:
+            status_message = "(Denoiser Working ...)"
+        engine.tag_redraw()
     else:
         # Not in pause yet, keep drawing
         s = time()
@@ -217,11 +238,28 @@ def view_draw(engine, context, depsgraph):
             # print("view_draw(): session.UpdateStats() took %.1f ms" % ((time() - s) * 1000))
         except RuntimeError as error:
             print("[Engine/Viewport] Error during UpdateStats():", error)
-        s = time()
-        framebuffer.update(engine.session, scene)
-        framebuffer.reset_denoiser()
+
+        if periodic_denoise:
+            stats = engine.session.GetStats()
+            samples = stats.Get("stats.renderengine.pass").GetInt()
+
+            if framebuffer.is_periodic_denoiser_due(viewport, samples):
+                try:
+                    framebuffer.start_periodic_denoiser(engine.session, context, scene,
+                                                        denoiser_pipeline_index, samples)
+                except Exception as error:
+                    status_message = "Could not start denoiser: %s" % error
+            elif framebuffer.denoiser_result_cached:
+                # Keep showing the last denoised result until the next run
+                status_message = "(Denoised)"
+            else:
+                framebuffer.update(engine.session, scene)
+        else:
+            s = time()
+            framebuffer.update(engine.session, scene)
+            framebuffer.reset_denoiser()
+            # print("view_draw(): framebuffer update took %.1f ms" % ((time() - s) * 1000))
         engine.tag_redraw()
-        # print("view_draw(): framebuffer update took %.1f ms" % ((time() - s) * 1000))
 
     s = time()
     framebuffer.draw(engine, context, scene)
@@ -4,6 +4,7 @@ from ..bin import pyluxcore
 from .. import utils
 from ..utils import render as utils_render
 from ..utils import compatibility as utils_compatibility
+from ..utils import image_sequence_index
 from ..utils.errorlog import LuxCoreErrorLog
 from . import (
     caches, camera, config,
@@ -12,6 +13,10 @@ from . import (
 )
 from .light import WORLD_BACKGROUND_LIGHT_NAME
 from .caches.object_cache import supports_live_transform
+from .geometry_cache import GeometryCache
+from .image import ImageExporter
+from .texture_budget import TextureBudget
+from .profiler import ExportProfiler, get_default_filepath as get_default_profile_filepath
 
 
 class Change:
@@ -44,10 +49,17 @@ class Change:
 
 
 class Exporter(object):
-    def __init__(self, stats=None):
+    def __init__(self, stats=None, persistent_animation=False):
         self.scene = None  # TODO I would like to remove this, the evaluated scene is temporary
         self.stats = stats
 
+        # If enabled, the LuxCore scene is kept alive between the frames of an animation
+        # and only the changes of each frame are applied to it (see update_animation_frame()).
+        # All meshes are exported as instances in this mode, so transformations can be edited.
+        self.persistent_animation = persistent_animation
+        self.luxcore_scene = None
+        self.view_layer_name = None
+
         self.config_cache = caches.StringCache()
         self.camera_cache = caches.CameraCache()
         # self.object_cache = caches.ObjectCache()
@@ -58,6 +70,10 @@ class Exporter(object):
         self.imagepipeline_cache = caches.StringCache()
         self.halt_cache = caches.StringCache()
         self.motion_blur_enabled = False
+        # Only used in final render, see create_session()
+        self.geometry_cache = None
+        # Only used if stats are recorded (final render)
+        self.profiler = None
         
         # A dictionary with the following mapping:
         # {node_key: luxcore_name}
@@ -70,6 +86,9 @@ class Exporter(object):
 
         # If a light/material uses a lightgroup, the id is stored here during export
         self.lightgroup_cache = set()
+        # (filepath, storage, channel) of the imagemaps counted in the texture memory statistics
+        self.imagemap_storage_cache = set()
+        self.texture_budget = None
 
     def create_session(self, depsgraph, context=None, engine=None, view_layer=None):
         # Notes:
@@ -83,12 +102,27 @@ class Exporter(object):
         stats = self.stats
         if stats:
             stats.reset()
+            self.profiler = ExportProfiler()
+            self.imagemap_storage_cache.clear()
 
         # We have to run the compatibility code before export because it could be that
         # the user has linked/appended assets with node trees from previous versions of
         # the addon since opening the .blend file.
         utils_compatibility.run()
 
+        # Files of image sequences might have been added or removed since the last export
+        image_sequence_index.revalidate()
+
+        geometry_cache_settings = scene.luxcore.config.geometry_cache
+        if geometry_cache_settings.enabled and not context:
+            self.geometry_cache = GeometryCache(geometry_cache_settings)
+
+        texture_budget_settings = scene.luxcore.config.texture_budget
+        if texture_budget_settings.enabled:
+            self.texture_budget = TextureBudget(texture_budget_settings, is_viewport_render=context is not None)
+        else:
+            self.texture_budget = None
+
         # Scene
         luxcore_scene = pyluxcore.Scene()
         scene_props = pyluxcore.Properties()
@@ -112,7 +146,7 @@ class Exporter(object):
             # Export was cancelled by user
             return None
 
-        if is_viewport_render:
+        if is_viewport_render or self.persistent_animation:
             self.visibility_cache.init(depsgraph, context)
 
         # Motion blur
@@ -134,6 +168,11 @@ class Exporter(object):
         world_props = world.convert(self, depsgraph, scene, is_viewport_render)
         scene_props.Set(world_props)
 
+        if self.texture_budget:
+            replaced_count = self.texture_budget.apply(scene_props, depsgraph)
+            if stats:
+                stats.downscaled_textures.value = replaced_count
+
         if scene.luxcore.debug.enabled and scene.luxcore.debug.print_properties:
             print("-" * 50)
             print("DEBUG: Scene Properties:\n")
@@ -147,18 +186,91 @@ class Exporter(object):
         # The instances dict can be quite large, delete explicitely (TODO maybe even call gc.collect()?)
         del instances
 
+        if self.geometry_cache:
+            self.geometry_cache.disk_cache.enforce_size_limit()
+        ImageExporter.enforce_cache_size_limit()
+
         # Regularly check if we should abort the export (important in heavy scenes)
         if engine and engine.test_break():
             return None
 
+        if self.persistent_animation:
+            self.luxcore_scene = luxcore_scene
+            self.view_layer_name = view_layer.name if view_layer else None
+
+        return self._create_render_session(luxcore_scene, scene, context, engine, start)
+
+    def can_update_animation_frame(self, depsgraph):
+        """
+        Check if the changes of the current frame can be applied to the LuxCore scene
+        of the previous frame. Changes to particle systems and instancers require a full
+        export because their instances are not tracked individually in final render.
+        """
+        if not self.persistent_animation or self.luxcore_scene is None:
+            return False
+
+        if depsgraph.id_type_updated("PARTICLE"):
+            return False
+
+        if depsgraph.id_type_updated("OBJECT"):
+            for dg_update in depsgraph.updates:
+                obj = dg_update.id
+                if isinstance(obj, bpy.types.Object) and (obj.is_instancer or obj.particle_systems):
+                    return False
+        return True
+
+    def update_animation_frame(self, depsgraph, engine=None):
+        """
+        Apply the changes of the current animation frame to the LuxCore scene
+        that was kept from the previous frame, then create a new session for it.
+        Check can_update_animation_frame() before calling this method.
+        """
+        print("[Exporter] Updating scene for animation frame", depsgraph.scene_eval.frame_current)
+        start = time()
+        self.scene = depsgraph.scene_eval
+        scene = self.scene
+        if self.stats:
+            self.stats.reset()
+            self.profiler = ExportProfiler()
+            self.imagemap_storage_cache.clear()
+        self.node_cache.clear()
+        utils_compatibility.run()
+
+        changes = Change.NONE
+        if self.camera_cache.diff(self, scene, depsgraph, None):
+            changes |= Change.CAMERA
+        if self.object_cache2.diff(depsgraph):
+            changes |= Change.OBJECT
+        if self.material_cache.diff(depsgraph):
+            changes |= Change.MATERIAL
+        if self.visibility_cache.diff(depsgraph, None):
+            changes |= Change.VISIBILITY
+            if self.visibility_cache.has_new_objects:
+                changes |= Change.OBJECT
+        if self.world_cache.diff(depsgraph):
+            changes |= Change.WORLD
+
+        print("[Exporter] Frame changes:", Change.to_string(changes))
+        if changes & Change.REQUIRES_SCENE_EDIT:
+            props = self._update_scene(depsgraph, None, changes, self.luxcore_scene)
+            self.luxcore_scene.Parse(props)
+
+        if engine and engine.test_break():
+            return None
+
+        return self._create_render_session(self.luxcore_scene, scene, None, engine, start)
+
+    def _create_render_session(self, luxcore_scene, scene, context, engine, start):
+        stats = self.stats
+
         # Convert config at last because all lightgroups and passes have to be already defined
         config_props = config.convert(self, scene, context, engine)
         if str(config_props) == "":
             # Config props are empty: there was a critical error in config export, we can't render
             raise Exception("Errors in config, check error log")
 
-        # Init config cache (convert to string here because config_props gets changed below)
-        self.config_cache.diff(str(config_props))
+        # Init config cache (use a copy here because config_props gets changed below)
+        self.config_cache.diff(pyluxcore.Properties(config_props))
 
         # Imagepipeline
         imagepipeline_props = imagepipeline.convert(scene, context)
@@ -196,6 +308,9 @@ class Exporter(object):
             stats.export_time.value = export_time
             self._init_stats(stats, config_props, scene)
 
+        if self.profiler:
+            self._save_profile(stats, scene)
+
         # Pre-compile CUDA or OpenCL kernels for viewport and final.
         renderengine_type = config_props.Get("renderengine.type").GetString()
         if renderengine_type.endswith("OCL") and not renderconfig.HasCachedKernels():
@@ -352,9 +467,10 @@ class Exporter(object):
 
     def update_session(self, changes, session):
         if changes & Change.IMAGEPIPELINE:
+            # LuxCore re-creates the whole imagepipeline from the parsed props, so they have to be complete
             session.Parse(self.imagepipeline_cache.props)
         if changes & Change.HALT:
-            session.Parse(self.halt_cache.props)
+            session.Parse(self.halt_cache.get_changed_props())
 
     def _update_config(self, session, config_props):
         renderconfig = session.GetRenderConfig()
@@ -383,7 +499,7 @@ class Exporter(object):
             # for mat in self.material_cache.changed_materials:
             #     luxcore_name, mat_props = material.convert(self, mat, context.scene, context)
             #     props.Set(mat_props)
-            self.material_cache.update(self, depsgraph, context, props)
+            self.material_cache.update(self, depsgraph, context is not None, props)
 
         if changes & Change.VISIBILITY:
             for key in self.visibility_cache.objects_to_remove:
@@ -403,14 +519,36 @@ class Exporter(object):
                 luxcore_scene.RemoveUnusedImageMaps()
 
         if changes & Change.WORLD:
-            if not context.scene.world or context.scene.world.luxcore.light == "none":
+            scene = context.scene if context else depsgraph.scene
+            if not scene.world or scene.world.luxcore.light == "none":
                 luxcore_scene.DeleteLight(WORLD_BACKGROUND_LIGHT_NAME)
 
-            world_props = world.convert(self, depsgraph, context.scene, is_viewport_render=True)
+            world_props = world.convert(self, depsgraph, scene, is_viewport_render=context is not None)
             props.Set(world_props)
 
+        if self.texture_budget:
+            # Textures of edited materials have to be downscaled again
+            self.texture_budget.apply(props, depsgraph)
+
         return props
 
+    def _save_profile(self, stats, scene):
+        stats.export_profile = self.profiler
+        settings = scene.luxcore.statistics
+
+        if settings.save_export_profile:
+            if settings.export_profile_filepath:
+                filepath = utils.get_abspath(settings.export_profile_filepath)
+            else:
+                filepath = get_default_profile_filepath()
+
+            try:
+                self.profiler.save(filepath)
+                print("[Exporter] Export profile saved to", filepath)
+            except OSError as error:
+                LuxCoreErrorLog.add_warning("Could not save export profile: " + str(error))
+        self.profiler = None
+
     def _init_stats(self, stats, config_props, scene):
         render_engine = config_props.Get("renderengine.type").GetString()
         stats.render_engine.value = utils_render.engine_to_str(render_engine)
@@ -132,6 +132,10 @@ def convert(exporter, scene, context=None, engine=None):
                 pipeline_index = _make_noise_detection_imagepipeline(context, scene, pipeline_props,
                                                                      pipeline_index, definitions)
                 pipeline_props.Set(pyluxcore.Property("film.noiseestimation.index", noise_detection_pipeline_index))
+        elif add_OIDN_AOVs:
+            # Viewport denoiser imagepipeline, it is only executed on demand when the viewport render is paused
+            pipeline_index = _make_viewport_denoiser_imagepipeline(context, scene, pipeline_props, engine,
+                                                                   pipeline_index, definitions)
 
         props = utils.create_props(prefix, definitions)
         props.Set(pipeline_props)
@@ -256,6 +260,27 @@ def _make_denoiser_imagepipeline(context, scene, props, engine, pipeline_index,
     return pipeline_index + 1
 
 
+def get_viewport_denoiser_imgpipeline_props(context, scene, pipeline_index):
+    """ The viewport always uses OIDN, regardless of the denoiser type selected for the final render """
+    prefix = "film.imagepipelines.%03d." % pipeline_index
+    definitions = OrderedDict()
+    index = 0
+
+    index = get_OIDN_props(definitions, scene, index)
+    index = imagepipeline.convert_defs(context, scene, definitions, index)
+
+    return utils.create_props(prefix, definitions)
+
+
+def _make_viewport_denoiser_imagepipeline(context, scene, props, engine, pipeline_index, output_definitions):
+    props.Set(get_viewport_denoiser_imgpipeline_props(context, scene, pipeline_index))
+    _add_output(output_definitions, "RGB_IMAGEPIPELINE", pipeline_index)
+    # The viewport also converts the config without engine when checking for changes
+    if engine:
+        engine.aov_imagepipelines[engine.DENOISED_OUTPUT_NAME] = pipeline_index
+    return pipeline_index + 1
+
+
 def _make_noise_detection_imagepipeline(context, scene, props, pipeline_index, output_definitions):
     prefix = "film.imagepipelines.%03d." % pipeline_index
     definitions = OrderedDict()
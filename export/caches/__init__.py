@@ -1,5 +1,6 @@
 import bpy
 from ... import utils
+from ...bin import pyluxcore
 from ...utils import EXPORTABLE_OBJECTS
 from .. import camera, material
 
@@ -7,22 +8,60 @@ from .object_cache import ObjectCache2, supports_live_transform
 
 
 class StringCache:
+    """
+    Detects changes between consecutive pyluxcore.Properties.
+    The old and new props are compared as a whole (one string built by LuxCore),
+    the changed keys are only searched if there are changes.
+    """
     def __init__(self):
         self.props = None
+        self.props_str = None
+        # Keys that were changed or added in the last diff() call
+        self.changed_keys = set()
+        # True if the last diff() call found keys that are not present anymore
+        self.has_removed_keys = False
 
     def diff(self, new_props):
-        props_str = str(self.props)
         new_props_str = str(new_props)
 
         if self.props is None:
             # Not initialized yet
-            self.props = new_props
-            return True
+            has_changes = True
+            self.changed_keys = set(new_props.GetAllNames())
+            self.has_removed_keys = False
+        else:
+            has_changes = new_props_str != self.props_str
+            if has_changes:
+                values = _get_values(self.props)
+                new_values = _get_values(new_props)
+                self.changed_keys = {key for key, value in new_values.items() if values.get(key) != value}
+                self.has_removed_keys = not values.keys() <= new_values.keys()
+            else:
+                self.changed_keys = set()
+                self.has_removed_keys = False
 
-        has_changes = props_str != new_props_str
         self.props = new_props
+        self.props_str = new_props_str
         return has_changes
 
+    def get_changed_props(self):
+        """
+        Returns only the properties that changed in the last diff() call.
+        If keys were removed, all properties are returned, because the
+        receiver has to know that the removed keys are not set anymore.
+        """
+        if self.has_removed_keys:
+            return self.props
+
+        changed_props = pyluxcore.Properties()
+        for key in self.changed_keys:
+            changed_props.Set(self.props.Get(key))
+        return changed_props
+
+
+def _get_values(props):
+    return {key: props.Get(key).GetValuesString() for key in props.GetAllNames()}
+
 
 class CameraCache:
     def __init__(self):
@@ -66,6 +105,11 @@ class MaterialCache:
 
 
 class VisibilityCache:
+    """
+    Tracks which objects are visible. After the initial scan, only the objects
+    reported by depsgraph updates are checked again, unless a structural change
+    (e.g. in the collections or the number of objects) requires a full rescan.
+    """
     def __init__(self):
         # sets containing keys
         self.last_visible_objects = None
@@ -73,30 +117,121 @@ class VisibilityCache:
         
         self.has_new_objects = False
 
+        # Maps the memory address of an original object to the keys of its visible instances.
+        # For instancers these are the keys of their instances, for all other objects only their own key.
+        self.keys_by_pointer = {}
+        # Objects which had instances during the last check
+        self.instancer_pointers = set()
+        self.object_count = 0
+        self.in_local_view = False
+
     def init(self, depsgraph, context):
-        self.last_visible_objects = self._get_visible_objects(depsgraph, context)
+        self._full_rescan(depsgraph, context)
 
     def diff(self, depsgraph, context):
-        visible_objs = self._get_visible_objects(depsgraph, context)
-        self.objects_to_remove = self.last_visible_objects - visible_objs
-        self.has_new_objects = bool(visible_objs - self.last_visible_objects)
+        last_visible_objects = self.last_visible_objects
+
+        if self._needs_full_rescan(depsgraph, context):
+            self._full_rescan(depsgraph, context)
+            visible_objs = self.last_visible_objects
+            self.objects_to_remove = last_visible_objects - visible_objs
+            new_objects = visible_objs - last_visible_objects
+        else:
+            self.objects_to_remove, new_objects = self._update_dirty_objects(depsgraph, context)
+            last_visible_objects -= self.objects_to_remove
+            last_visible_objects |= new_objects
+
+        self.has_new_objects = bool(new_objects)
         print("has_new_objs:", self.has_new_objects)
-        self.last_visible_objects = visible_objs
         return bool(self.objects_to_remove) or self.has_new_objects
 
-    def _get_visible_objects(self, depsgraph, context):
+    def _needs_full_rescan(self, depsgraph, context):
+        if self.last_visible_objects is None:
+            return True
+        # Collections were hidden, excluded or their content changed
+        if depsgraph.id_type_updated("COLLECTION") or depsgraph.id_type_updated("SCENE"):
+            return True
+        # Objects were added, deleted or hidden (hidden objects are not contained in depsgraph.objects)
+        if len(depsgraph.objects) != self.object_count:
+            return True
+        if context and (context.space_data.local_view is not None) != self.in_local_view:
+            return True
+        return False
+
+    def _full_rescan(self, depsgraph, context):
+        self.keys_by_pointer.clear()
+        self.instancer_pointers.clear()
+        self.last_visible_objects = self._get_visible_objects(depsgraph, context)
+        self.object_count = len(depsgraph.objects)
+        self.in_local_view = bool(context) and context.space_data.local_view is not None
+
+    def _update_dirty_objects(self, depsgraph, context):
+        removed = set()
+        added = set()
+        # Instancers have to be looked up in depsgraph.object_instances, other objects are checked directly
+        dirty_instancers = set()
+
+        for dg_update in depsgraph.updates:
+            obj = dg_update.id
+            if not isinstance(obj, bpy.types.Object):
+                continue
+
+            pointer = obj.original.as_pointer()
+            old_keys = self.keys_by_pointer.pop(pointer, set())
+
+            if obj.is_instancer or obj.particle_systems or pointer in self.instancer_pointers:
+                self.instancer_pointers.discard(pointer)
+                dirty_instancers.add(pointer)
+                removed |= old_keys
+                continue
+
+            new_keys = {utils.make_key(obj)} if self._is_obj_visible(obj, context) else set()
+            if new_keys:
+                self.keys_by_pointer[pointer] = new_keys
+            removed |= old_keys - new_keys
+            added |= new_keys - old_keys
+
+        if dirty_instancers:
+            new_keys = self._get_visible_objects(depsgraph, context, dirty_instancers)
+            # Instances that are still visible are neither removed nor new
+            added |= new_keys - removed
+            removed -= new_keys
+
+        return removed, added
+
+    def _is_obj_visible(self, obj, context):
+        """ Visibility check for objects that are not instancers, without depsgraph.object_instances """
+        if obj.luxcore.exclude_from_render:
+            return False
+        if context:
+            return obj.original.visible_get() and obj.visible_in_viewport_get(context.space_data)
+        return not obj.original.hide_render
+
+    def _get_visible_objects(self, depsgraph, context, only_these_pointers=None):
         keys = set()
 
         for dg_obj_instance in depsgraph.object_instances:
+            # For duplis, check visibility of parent (emitter)
+            obj = dg_obj_instance.parent if dg_obj_instance.parent else dg_obj_instance.object
+            pointer = obj.original.as_pointer()
+
+            if only_these_pointers is not None and pointer not in only_these_pointers:
+                continue
+
+            if dg_obj_instance.is_instance:
+                self.instancer_pointers.add(pointer)
+
             if not supports_live_transform(dg_obj_instance.particle_system):
                 continue
 
             if dg_obj_instance.show_self:
-                # For duplis, check visibility of parent (emitter)
-                obj = dg_obj_instance.parent if dg_obj_instance.parent else dg_obj_instance.object
-                if obj.luxcore.exclude_from_render or not obj.visible_in_viewport_get(context.space_data):
+                if obj.luxcore.exclude_from_render:
+                    continue
+                if context and not obj.visible_in_viewport_get(context.space_data):
                     continue
-                keys.add(utils.make_key_from_instance(dg_obj_instance))
+                key = utils.make_key_from_instance(dg_obj_instance)
+                keys.add(key)
+                self.keys_by_pointer.setdefault(pointer, set()).add(key)
         return keys
 
 
@@ -1,11 +1,14 @@
 import bpy
-from array import array
+import numpy as np
+from collections import defaultdict
 from functools import lru_cache
 from time import time
 
 from ... import utils
 from ...bin import pyluxcore
 from .. import mesh_converter
+from ..mesh_deduplicator import MeshDeduplicator
+from ..frustum_culling import FrustumCuller
 from ..hair import (
     convert_hair, warn_about_missing_uvs, set_hair_props, 
     make_hair_shape_name, get_hair_material_index,
@@ -20,6 +23,7 @@ from ...nodes.textures.random_per_island import DATAINDEX_RANDOM_PER_ISLAND
 
 
 MAX_PARTICLES_FOR_LIVE_TRANSFORM = 2000
+MAX_INITIAL_DUPLI_CAPACITY = 2 ** 14
 
 
 def uses_pointiness(node_tree):
@@ -53,6 +57,22 @@ def get_material(obj, material_index, depsgraph):
     return mat
         
 
+def get_shape_signature(obj, depsgraph):
+    """
+    The node trees of the materials of the object, they define additional shapes (displacement,
+    pointiness etc.) on top of the mesh. Objects can only share a mesh if their signatures are equal.
+    """
+    material_override = depsgraph.view_layer_eval.material_override
+    signature = []
+
+    for slot in obj.material_slots:
+        mat = material_override or slot.material
+        node_tree = mat.luxcore.node_tree if mat else None
+        signature.append(node_tree.name_full if node_tree else None)
+
+    return tuple(signature)
+
+
 def export_material(obj, material_index, exporter, depsgraph, is_viewport_render):
     mat = get_material(obj, material_index, depsgraph)
 
@@ -117,13 +137,82 @@ def get_obj_count_estimate(depsgraph):
 
 
 class Duplis:
-    def __init__(self, exported_obj):
+    """
+    Collects the transformations and object IDs of all instances of one source object.
+    The data is written into contiguous float32/int64 buffers which grow geometrically,
+    so they can be passed to DuplicateObject() without any conversion.
+    New instances are appended to plain lists first and copied into the buffers in batches
+    of BATCH_SIZE (flush()), because a numpy assignment per instance costs much more than a list append.
+    """
+    INITIAL_CAPACITY = 256
+    BATCH_SIZE = 4096
+
+    def __init__(self, exported_obj, chosen_id=-1, capacity=INITIAL_CAPACITY):
         self.exported_obj = exported_obj
-        self.matrices = array("f", [])
-        self.object_ids = array("I", [])
+        # The object ID chosen by the user for the source object. If it is -1,
+        # the random_id of each instance is used instead.
+        self.chosen_id = chosen_id
+        self.count = 0
+        self.capacity = max(1, capacity)
+        self.matrices = np.empty((self.capacity, 16), dtype=np.float32)
+        # random_id is not always in unsigned int range, it is masked when the IDs are requested
+        self.random_ids = np.empty(self.capacity, dtype=np.int64)
+        # Instances that were not copied into the buffers yet
+        self.pending_matrices = []
+        self.pending_random_ids = []
+        # (center, radius) of the source object in object space, only set if the instances can be culled
+        self.bounding_sphere = None
+
+    def grow(self):
+        self.capacity *= 2
+        self.matrices.resize((self.capacity, 16), refcheck=False)
+        self.random_ids.resize(self.capacity, refcheck=False)
+
+    def flush(self):
+        """ Copy the pending instances into the buffers, has to be called before the buffers are read """
+        pending_count = len(self.pending_matrices)
+        if pending_count == 0:
+            return
+
+        start = self.count
+        end = start + pending_count
+        while end > self.capacity:
+            self.grow()
+
+        # One conversion of the whole batch in numpy instead of one assignment per instance
+        self.matrices[start:end] = self.pending_matrices
+        if self.chosen_id == -1:
+            self.random_ids[start:end] = self.pending_random_ids
+        self.count = end
+        self.pending_matrices.clear()
+        self.pending_random_ids.clear()
 
     def get_count(self):
-        return len(self.object_ids)
+        return self.count
+
+    def get_matrices(self):
+        # Slicing along the first axis keeps the buffer contiguous
+        return self.matrices[:self.count]
+
+    def get_object_ids(self):
+        if self.chosen_id != -1:
+            return np.full(self.count, self.chosen_id, dtype=np.uint32)
+        # Same as utils.make_object_id(), but for all instances at once
+        return (self.random_ids[:self.count] & 0xfffffffe).astype(np.uint32)
+
+
+def get_dupli_capacity_estimate(dg_obj_instance):
+    particle_system = dg_obj_instance.particle_system
+    if particle_system:
+        particle_count = int(get_total_particle_count(particle_system, False))
+        settings = particle_system.settings
+        if (settings.render_type == "COLLECTION" and settings.instance_collection
+                and not settings.use_whole_collection):
+            # Each particle instances only one of the objects in the collection
+            particle_count //= max(1, len(settings.instance_collection.all_objects))
+        # The buffers grow if the estimate is too low, so we don't preallocate too much right away
+        return min(max(particle_count, Duplis.INITIAL_CAPACITY), MAX_INITIAL_DUPLI_CAPACITY)
+    return Duplis.INITIAL_CAPACITY
 
 
 class ObjectCache2:
@@ -132,15 +221,57 @@ class ObjectCache2:
         self.exported_meshes = {}
         self.exported_hair = {}
 
+        # Indices used to find the exported objects affected by a depsgraph update (see update()).
+        # Objects are identified by the memory address of the original object.
+        # Maps an object to the keys of all exported objects it is the source or the parent (instancer) of
+        self.obj_keys_by_pointer = defaultdict(set)
+        # Maps a mesh key to all objects using this mesh
+        self.pointers_by_mesh_key = defaultdict(set)
+        # Only set during the first_run() of a final render
+        self.mesh_deduplicator = None
+        self.frustum_culler = None
+
     def first_run(self, exporter, depsgraph, view_layer, engine, luxcore_scene, scene_props, context):
         is_viewport_render = bool(context)
+
+        # Particle system counts might have changed
+        supports_live_transform.cache_clear()
+
+        if (not is_viewport_render and not exporter.persistent_animation
+                and exporter.scene.luxcore.config.deduplicate_meshes):
+            # Later updates re-export meshes per object, so this is only possible if there are none
+            self.mesh_deduplicator = MeshDeduplicator(depsgraph)
+
+        culling_settings = exporter.scene.luxcore.config.frustum_culling
+        if (not is_viewport_render and not exporter.persistent_animation
+                and culling_settings.enabled and FrustumCuller.is_supported(exporter.scene)):
+            # Later frames might use a different camera view, so this is only possible without persistent animation
+            self.frustum_culler = FrustumCuller(exporter.scene, culling_settings.margin / 100)
+
+        try:
+            return self._export_instances(exporter, depsgraph, view_layer, engine, luxcore_scene,
+                                          scene_props, context)
+        finally:
+            if self.mesh_deduplicator:
+                if exporter.stats:
+                    exporter.stats.deduplicated_meshes.value = self.mesh_deduplicator.deduplicated_count
+                self.mesh_deduplicator = None
+            if self.frustum_culler:
+                if exporter.stats:
+                    exporter.stats.culled_objects.value = self.frustum_culler.culled_count
+                self.frustum_culler = None
+
+    def _export_instances(self, exporter, depsgraph, view_layer, engine, luxcore_scene, scene_props, context):
+        """ Returns the Duplis of all instanced objects, or None if the export was cancelled """
+        is_viewport_render = bool(context)
         instances = {}
 
         if engine:
             obj_count_estimate = max(1, get_obj_count_estimate(depsgraph))
 
-        # Particle system counts might have changed
-        supports_live_transform.cache_clear()
+        # Local names to avoid the attribute lookups in the instancing loop below
+        matrix_to_list = pyluxcore.BlenderMatrix4x4ToList
+        batch_size = Duplis.BATCH_SIZE
 
         for index, dg_obj_instance in enumerate(depsgraph.object_instances):
             obj = dg_obj_instance.object
@@ -159,16 +290,19 @@ class ObjectCache2:
                 try:
                     # The code in this try block is performance-critical, as it is
                     # executed most often when exporting millions of instances.
+                    # Everything that is the same for all instances of a source object
+                    # is looked up only once and stored in the Duplis.
                     duplis = instances[obj.original.as_pointer()]
                     # If duplis is None, then a non-exportable object like a curve with zero faces is being duplicated
                     if duplis:
-                        obj_id = dg_obj_instance.object.original.luxcore.id
-                        if obj_id == -1:
-                            obj_id = dg_obj_instance.random_id & 0xfffffffe
-                        duplis.object_ids.append(obj_id)
+                        pending_matrices = duplis.pending_matrices
                         # We need a copy of matrix_world here, not sure why, but if we don't
                         # make a copy, we only get an identity matrix in C++
-                        duplis.matrices.extend(pyluxcore.BlenderMatrix4x4ToList(dg_obj_instance.matrix_world.copy()))
+                        pending_matrices.append(matrix_to_list(dg_obj_instance.matrix_world.copy()))
+                        if duplis.chosen_id == -1:
+                            duplis.pending_random_ids.append(dg_obj_instance.random_id)
+                        if len(pending_matrices) == batch_size:
+                            duplis.flush()
                 except KeyError:
                     if engine:
                         if engine.test_break():
@@ -179,7 +313,11 @@ class ObjectCache2:
                     if exported_obj:
                         # Note, the transformation matrix and object ID of this first instance is not added
                         # to the duplication list, since it already exists in the scene
-                        instances[obj.original.as_pointer()] = Duplis(exported_obj)
+                        duplis = Duplis(exported_obj, obj.original.luxcore.id,
+                                        get_dupli_capacity_estimate(dg_obj_instance))
+                        if self.frustum_culler and self.frustum_culler.can_cull(obj):
+                            duplis.bounding_sphere = self.frustum_culler.get_bounding_sphere(obj)
+                        instances[obj.original.as_pointer()] = duplis
                     else:
                         # Could not export the object, happens e.g. with curve objects with zero faces
                         instances[obj.original.as_pointer()] = None
@@ -188,6 +326,10 @@ class ObjectCache2:
                 if not utils.is_instance_visible(dg_obj_instance, obj, context):
                     continue
 
+                if (self.frustum_culler and obj.type in MESH_OBJECTS and self.frustum_culler.can_cull(obj)
+                        and not self.frustum_culler.is_visible(obj, dg_obj_instance.matrix_world)):
+                    continue
+
                 if engine:
                     if engine.test_break():
                         return None
@@ -196,6 +338,16 @@ class ObjectCache2:
                 self._convert_obj(exporter, dg_obj_instance, obj, depsgraph, luxcore_scene,
                                   scene_props, is_viewport_render, view_layer, engine)
 
+        for duplis in instances.values():
+            if duplis:
+                duplis.flush()
+
+        if self.frustum_culler:
+            # Culling all instances at once after they are collected is much faster than testing each one
+            for duplis in instances.values():
+                if duplis and duplis.bounding_sphere is not None:
+                    self.frustum_culler.cull_duplis(duplis)
+
         #self._debug_info()
         return instances
 
@@ -218,7 +370,8 @@ class ObjectCache2:
             for part in duplis.exported_obj.parts:
                 src_name = part.lux_obj
                 dst_name = src_name + "dupli"
-                luxcore_scene.DuplicateObject(src_name, dst_name, duplis.get_count(), duplis.matrices, duplis.object_ids)
+                luxcore_scene.DuplicateObject(src_name, dst_name, duplis.get_count(),
+                                              duplis.get_matrices(), duplis.get_object_ids())
 
                 # TODO: support steps and times (motion blur)
                 # steps = 0 # TODO
@@ -291,6 +444,9 @@ class ObjectCache2:
         if obj.data is None:
             return None
 
+        start_time = time()
+        # The material export time is recorded separately, it is subtracted from the object time
+        material_time = exporter.profiler.material_time if exporter.profiler else 0
         obj_key = utils.make_key_from_instance(dg_obj_instance)
         exported_stuff = None
         props = pyluxcore.Properties()
@@ -352,6 +508,13 @@ class ObjectCache2:
             scene_props.Set(props)
             self.exported_objects[obj_key] = exported_stuff
 
+            self.obj_keys_by_pointer[obj.original.as_pointer()].add(obj_key)
+            if dg_obj_instance.is_instance:
+                self.obj_keys_by_pointer[dg_obj_instance.parent.original.as_pointer()].add(obj_key)
+
+        if exporter.profiler:
+            material_time = exporter.profiler.material_time - material_time
+            exporter.profiler.add_object(obj.name, time() - start_time - material_time)
         return exported_stuff
 
     def _convert_mesh_obj(self, exporter, dg_obj_instance, obj, obj_key, depsgraph,
@@ -359,9 +522,15 @@ class ObjectCache2:
         transform = dg_obj_instance.matrix_world
 
         use_instancing = is_viewport_render or dg_obj_instance.is_instance or utils.can_share_mesh(obj.original) \
-                         or (exporter.motion_blur_enabled and obj.luxcore.enable_motion_blur)
+                         or (exporter.motion_blur_enabled and obj.luxcore.enable_motion_blur) \
+                         or exporter.persistent_animation
 
-        mesh_key = self._get_mesh_key(obj, use_instancing, is_viewport_render)
+        if self.mesh_deduplicator and self.mesh_deduplicator.has_duplicates(obj):
+            use_instancing = True
+            mesh_key = self._get_mesh_key(obj, use_instancing, is_viewport_render)
+            mesh_key = self.mesh_deduplicator.get_mesh_key(obj, mesh_key, get_shape_signature(obj, depsgraph))
+        else:
+            mesh_key = self._get_mesh_key(obj, use_instancing, is_viewport_render)
 
         if use_instancing and mesh_key in self.exported_meshes:
             exported_mesh = self.exported_meshes[mesh_key]
@@ -373,6 +542,7 @@ class ObjectCache2:
             loaded_from_cache = False
 
         if exported_mesh:
+            self.pointers_by_mesh_key[mesh_key].add(obj.original.as_pointer())
             mat_names = []
             for idx, (shape_name, mat_index) in enumerate(exported_mesh.mesh_definitions):
                 shape = shape_name
@@ -401,7 +571,8 @@ class ObjectCache2:
     def update(self, exporter, depsgraph, luxcore_scene, scene_props, context):
         is_viewport_render = bool(context)
         redefine_objs_with_these_mesh_keys = []
-        # Always instance in viewport so we can move objects around
+        # Always instance in viewport so we can move objects around. In final render,
+        # this method is only used for persistent animations, where everything is instanced, too.
         use_instancing = True
 
         # Geometry updates (mesh edit, modifier edit etc.)
@@ -409,11 +580,13 @@ class ObjectCache2:
             for dg_update in depsgraph.updates:
                 if dg_update.is_updated_geometry and isinstance(dg_update.id, bpy.types.Object):
                     obj = dg_update.id
-                    if not utils.is_obj_visible(obj) or not obj.visible_in_viewport_get(context.space_data):
+                    if not utils.is_obj_visible(obj):
+                        continue
+                    if context and not obj.visible_in_viewport_get(context.space_data):
                         continue
 
                     if obj.type in MESH_OBJECTS:
-                        mesh_key = self._get_mesh_key(obj, use_instancing)
+                        mesh_key = self._get_mesh_key(obj, use_instancing, is_viewport_render)
 
                         # if mesh_key not in self.exported_meshes:
                         # TODO this can happen if a deforming modifier is added
@@ -449,8 +622,10 @@ class ObjectCache2:
                             if psys.particles and settings.type == "HAIR" and settings.render_type == "PATH":
                                 # Can't use the memory address of the psys as key because it changes
                                 # when the psys is updated (e.g. because some hair moves)
-                                psys_key = make_psys_key(obj, psys, True)
-                                del self.exported_hair[psys_key]
+                                # In final render, only hair of instances is exported for duplication
+                                for is_for_duplication in (True, False):
+                                    psys_key = make_psys_key(obj, psys, is_for_duplication)
+                                    self.exported_hair.pop(psys_key, None)
                     elif obj.type == "LIGHT":
                         obj_key = utils.make_key(obj)
                         props, exported_stuff = light.convert_light(exporter, obj, obj_key, depsgraph, luxcore_scene,
@@ -459,45 +634,130 @@ class ObjectCache2:
                             self.exported_objects[obj_key] = exported_stuff
                             scene_props.Set(props)
 
-        # TODO maybe not loop over all instances, instead only loop over updated
-        #  objects and check if they have a particle system that needs to be updated?
-        #  Would be better for performance with many particles, however I'm not sure
-        #  we can find all instances corresponding to one particle system?
+        # Objects that have to be looked up in depsgraph.object_instances. All other updated objects
+        # are not instanced, so they can be updated directly without looping over all instances.
+        pointers_to_sweep = set()
+        # If objects became visible, we don't know which ones, so all instances have to be checked
+        full_sweep = exporter.visibility_cache.has_new_objects
+
+        # All objects using a re-exported mesh have to be re-defined
+        for mesh_key in redefine_objs_with_these_mesh_keys:
+            pointers_to_sweep |= self.pointers_by_mesh_key[mesh_key]
+
+        if not full_sweep:
+            for dg_update in depsgraph.updates:
+                obj = dg_update.id
+                if not isinstance(obj, bpy.types.Object):
+                    continue
+                if obj.type == "LIGHT" and dg_update.is_updated_geometry:
+                    # Was already re-exported above
+                    continue
+                self._update_obj(exporter, obj, depsgraph, luxcore_scene, scene_props, context, pointers_to_sweep)
 
         # Currently, every update that doesn't require a mesh re-export happens here
-        for dg_obj_instance in depsgraph.object_instances:
-            if not supports_live_transform(dg_obj_instance.particle_system):
-                continue
+        if full_sweep or pointers_to_sweep:
+            self._update_instances(exporter, depsgraph, luxcore_scene, scene_props, context,
+                                   redefine_objs_with_these_mesh_keys, pointers_to_sweep, full_sweep)
+
+        #self._debug_info()
+
+    def _update_obj(self, exporter, obj, depsgraph, luxcore_scene, scene_props, context, pointers_to_sweep):
+        """
+        Update an object from depsgraph.updates without looking it up in depsgraph.object_instances.
+        If this is not possible (e.g. because the object is instanced or is new), the object is added to
+        pointers_to_sweep instead.
+        """
+        is_viewport_render = bool(context)
+        pointer = obj.original.as_pointer()
+
+        if pointer in pointers_to_sweep:
+            return
+
+        if obj.is_instancer:
+            # The instances of this object might have changed
+            pointers_to_sweep.add(pointer)
+            return
+
+        if not utils.is_obj_visible(obj) or (context and not obj.visible_in_viewport_get(context.space_data)):
+            # The visibility cache takes care of removing the object
+            return
+
+        obj_key = utils.make_key(obj)
+        obj_keys = self.obj_keys_by_pointer.get(pointer)
+
+        if not obj_keys and obj.type not in MESH_OBJECTS | {"LIGHT"}:
+            # Cameras, empties etc. that are neither exported nor parents of exported objects
+            return
+
+        if obj_key not in self.exported_objects or obj_keys != {obj_key}:
+            # The object is new, or other objects are instances of it
+            pointers_to_sweep.add(pointer)
+            return
+
+        if obj.type == "LIGHT":
+            props, exported_stuff = light.convert_light(exporter, obj, obj_key, depsgraph, luxcore_scene,
+                                                        obj.matrix_world.copy(), is_viewport_render)
+            if exported_stuff:
+                self.exported_objects[obj_key] = exported_stuff
+                scene_props.Set(props)
+        else:
+            self._update_exported_obj(self.exported_objects[obj_key], obj.matrix_world,
+                                      utils.make_object_id_from_obj(obj),
+                                      utils.obj_visible_to_camera(obj, is_viewport_render), scene_props)
+
+    def _update_instances(self, exporter, depsgraph, luxcore_scene, scene_props, context,
+                          redefine_objs_with_these_mesh_keys, pointers_to_sweep, full_sweep):
+        is_viewport_render = bool(context)
+        use_instancing = True
 
+        for dg_obj_instance in depsgraph.object_instances:
             obj = dg_obj_instance.object
+
+            if not full_sweep:
+                # Cheap test first, most instances are not affected by the update
+                is_affected = obj.original.as_pointer() in pointers_to_sweep
+                if not is_affected and dg_obj_instance.is_instance:
+                    is_affected = dg_obj_instance.parent.original.as_pointer() in pointers_to_sweep
+                if not is_affected:
+                    continue
+
+            if dg_obj_instance.is_instance:
+                if not is_viewport_render:
+                    # In final render, instances are duplicated with DuplicateObject() and can't be updated
+                    continue
+                if not supports_live_transform(dg_obj_instance.particle_system):
+                    continue
+
             if not utils.is_instance_visible(dg_obj_instance, obj, context):
                 continue
 
             obj_key = utils.make_key_from_instance(dg_obj_instance)
-            mesh_key = self._get_mesh_key(obj, use_instancing)
+            mesh_key = self._get_mesh_key(obj, use_instancing, is_viewport_render)
 
             if (obj_key in self.exported_objects and obj.type != "LIGHT") and not mesh_key in redefine_objs_with_these_mesh_keys:
-                exported_obj = self.exported_objects[obj_key]
-                updated = False
-
-                if exported_obj.transform != dg_obj_instance.matrix_world:
-                    exported_obj.transform = dg_obj_instance.matrix_world.copy()
-                    updated = True
-
-                obj_id = utils.make_object_id(dg_obj_instance)
-                if exported_obj.obj_id != obj_id:
-                    exported_obj.obj_id = obj_id
-                    updated = True
-
-                if exported_obj.visible_to_camera != utils.visible_to_camera(dg_obj_instance, is_viewport_render):
-                    exported_obj.visible_to_camera = utils.visible_to_camera(dg_obj_instance, is_viewport_render)
-                    updated = True
-
-                if updated:
-                    scene_props.Set(exported_obj.get_props())
+                self._update_exported_obj(self.exported_objects[obj_key], dg_obj_instance.matrix_world,
+                                          utils.make_object_id(dg_obj_instance),
+                                          utils.visible_to_camera(dg_obj_instance, is_viewport_render),
+                                          scene_props)
             else:
                 # Object is new and not in LuxCore yet, or it is a light, do a full export
                 self._convert_obj(exporter, dg_obj_instance, obj, depsgraph,
                                   luxcore_scene, scene_props, is_viewport_render)
 
-        #self._debug_info()
+    def _update_exported_obj(self, exported_obj, matrix_world, obj_id, visible_to_camera, scene_props):
+        updated = False
+
+        if exported_obj.transform != matrix_world:
+            exported_obj.transform = matrix_world.copy()
+            updated = True
+
+        if exported_obj.obj_id != obj_id:
+            exported_obj.obj_id = obj_id
+            updated = True
+
+        if exported_obj.visible_to_camera != visible_to_camera:
+            exported_obj.visible_to_camera = visible_to_camera
+            updated = True
+
+        if updated:
+            scene_props.Set(exported_obj.get_props())
@@ -0,0 +1,105 @@
+import numpy as np
+from mathutils import Vector
+from .. import utils
+
+
+class FrustumCuller:
+    """
+    Finds objects and instances that lie completely outside of the camera frustum, so they can
+    be skipped during the export. Objects are approximated by the bounding sphere of their
+    bounding box, so the test is conservative.
+
+    Note that culled objects are also missing in reflections, shadows and indirect light,
+    objects that are important for these should be marked with the "Never Cull" option.
+    """
+
+    def __init__(self, scene, margin):
+        """
+        margin: Relative enlargement of the frustum in each direction (e.g. 0.1 for 10%)
+        """
+        camera = scene.camera
+        is_ortho = camera.data.type == "ORTHO"
+        # The corners of the camera view in camera space (the camera looks along -Z)
+        frame = [Vector(corner) for corner in camera.data.view_frame(scene=scene)]
+        center = sum(frame, Vector()) / len(frame)
+        frame = [center + (corner - center) * (1 + margin) for corner in frame]
+
+        # Planes in camera space as (point, normal), the normals point into the frustum
+        planes = [(Vector((0, 0, 0)), Vector((0, 0, -1)))]
+        for i, corner in enumerate(frame):
+            next_corner = frame[(i + 1) % len(frame)]
+            direction = Vector((0, 0, -1)) if is_ortho else corner
+            normal = (next_corner - corner).cross(direction)
+            if normal.dot(center - corner) < 0:
+                normal.negate()
+            planes.append((corner, normal))
+
+        matrix = camera.matrix_world
+        normal_matrix = matrix.to_3x3().inverted_safe().transposed()
+        normals = []
+        offsets = []
+        for point, normal in planes:
+            world_normal = (normal_matrix @ normal).normalized()
+            normals.append(world_normal)
+            offsets.append(-world_normal.dot(matrix @ point))
+
+        self.normals = np.array(normals, dtype=np.float32)
+        self.offsets = np.array(offsets, dtype=np.float32)
+        self.culled_count = 0
+
+    @staticmethod
+    def is_supported(scene):
+        camera = scene.camera
+        return utils.is_valid_camera(camera) and camera.data.type in {"PERSP", "ORTHO"}
+
+    @staticmethod
+    def can_cull(obj):
+        """ Objects with particle systems might have hair or emit instances outside of their bounding box """
+        return not obj.original.luxcore.never_cull and not obj.particle_systems
+
+    @staticmethod
+    def get_bounding_sphere(obj):
+        """ Returns the center and radius of the bounding sphere in object space """
+        corners = np.array(obj.bound_box, dtype=np.float32)
+        bound_min = corners.min(axis=0)
+        bound_max = corners.max(axis=0)
+        return (bound_min + bound_max) / 2, float(np.linalg.norm(bound_max - bound_min)) / 2
+
+    def is_visible(self, obj, matrix_world):
+        center, radius = self.get_bounding_sphere(obj)
+        world_center = np.array(matrix_world @ Vector(center), dtype=np.float32)
+        scale = max(matrix_world.to_scale(), key=abs)
+        distances = self.normals @ world_center + self.offsets
+
+        if np.all(distances >= -radius * abs(scale)):
+            return True
+        self.culled_count += 1
+        return False
+
+    def cull_duplis(self, duplis):
+        """ Remove the instances outside of the frustum from the duplis """
+        count = duplis.count
+        if count == 0:
+            return
+
+        # The matrices are stored column-major (as returned by BlenderMatrix4x4ToList)
+        matrices = duplis.matrices[:count].reshape(count, 4, 4)
+        rotation_scale = matrices[:, :3, :3]
+        translation = matrices[:, 3, :3]
+
+        center, radius = duplis.bounding_sphere
+        world_centers = np.einsum("nji,j->ni", rotation_scale, center) + translation
+        # Largest scale factor of each instance
+        scales = np.linalg.norm(rotation_scale, axis=2).max(axis=1)
+
+        distances = world_centers @ self.normals.T + self.offsets
+        visible = np.all(distances >= -(radius * scales)[:, np.newaxis], axis=1)
+
+        visible_count = int(np.count_nonzero(visible))
+        if visible_count == count:
+            return
+
+        duplis.matrices[:visible_count] = duplis.matrices[:count][visible]
+        duplis.random_ids[:visible_count] = duplis.random_ids[:count][visible]
+        duplis.count = visible_count
+        self.culled_count += count - visible_count
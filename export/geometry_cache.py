@@ -0,0 +1,134 @@
+import bpy
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from ..bin import pyluxcore
+from .. import utils
+from ..utils.disk_cache import DiskCache
+from ..utils.errorlog import LuxCoreErrorLog
+from .caches.exported_data import ExportedMesh
+
+MANIFEST_NAME = "manifest.json"
+# Increase this number if the way meshes are converted changes, so old cache entries are not used anymore
+CACHE_VERSION = 1
+
+
+def get_default_directory():
+    return os.path.join(tempfile.gettempdir(), "luxcore_geometry_cache")
+
+
+class GeometryCache:
+    """
+    Stores converted LuxCore meshes on disk, so they can be loaded in later renders
+    (even in other Blender sessions) instead of being tessellated again.
+    Entries are keyed by a hash of the evaluated mesh data and the export settings.
+    """
+
+    def __init__(self, settings):
+        if settings.directory:
+            dirpath = utils.get_abspath(settings.directory)
+        else:
+            dirpath = get_default_directory()
+        self.disk_cache = DiskCache(dirpath, settings.max_size * 1024 * 1024)
+        # Set to False if the pyluxcore version can't save meshes
+        self.can_save = True
+
+    @staticmethod
+    def can_cache(mesh):
+        # LuxCore's mesh files can store only one UV map and one vertex color layer
+        return len(mesh.polygons) > 0 and len(mesh.uv_layers) <= 1 and len(mesh.vertex_colors) <= 1
+
+    @staticmethod
+    def make_key(mesh, material_count, mesh_transform):
+        """
+        Hash the evaluated mesh data. Has to be called before the mesh is tessellated
+        (the hash is much cheaper to compute than the tessellation).
+        """
+        hasher = hashlib.md5()
+        settings = (CACHE_VERSION, bpy.app.version, material_count, mesh_transform,
+                    mesh.use_auto_smooth, mesh.auto_smooth_angle, mesh.has_custom_normals)
+        hasher.update(repr(settings).encode())
+
+        hash_attribute(hasher, mesh.vertices, "co", np.float32, 3)
+        hash_attribute(hasher, mesh.edges, "vertices", np.int32, 2)
+        hash_attribute(hasher, mesh.edges, "use_edge_sharp", np.bool_)
+        hash_attribute(hasher, mesh.loops, "vertex_index", np.int32)
+        hash_attribute(hasher, mesh.polygons, "loop_start", np.int32)
+        hash_attribute(hasher, mesh.polygons, "loop_total", np.int32)
+        hash_attribute(hasher, mesh.polygons, "material_index", np.int32)
+        hash_attribute(hasher, mesh.polygons, "use_smooth", np.bool_)
+
+        for uv_layer in mesh.uv_layers:
+            hash_attribute(hasher, uv_layer.data, "uv", np.float32, 2)
+        for vertex_colors in mesh.vertex_colors:
+            hash_attribute(hasher, vertex_colors.data, "color", np.float32, 4)
+
+        if mesh.has_custom_normals:
+            mesh.calc_normals_split()
+            hash_attribute(hasher, mesh.loops, "normal", np.float32, 3)
+
+        return hasher.hexdigest()
+
+    def load(self, key, mesh_key, luxcore_scene):
+        """
+        Define the shapes of a cached mesh in the luxcore_scene.
+        Returns an ExportedMesh, or None if the mesh is not in the cache.
+        """
+        dirpath = self.disk_cache.get(key)
+        if dirpath is None:
+            return None
+
+        try:
+            with open(os.path.join(dirpath, MANIFEST_NAME), "r") as manifest_file:
+                manifest = json.load(manifest_file)
+
+            props = pyluxcore.Properties()
+            mesh_definitions = []
+
+            for suffix, mat_index, filename in manifest["shapes"]:
+                # The mesh key is not persistent between Blender sessions, only the suffix is stored
+                shape_name = mesh_key + suffix
+                prefix = "scene.shapes." + shape_name + "."
+                props.Set(pyluxcore.Property(prefix + "type", "mesh"))
+                props.Set(pyluxcore.Property(prefix + "ply", os.path.join(dirpath, filename)))
+                mesh_definitions.append([shape_name, mat_index])
+
+            # Define the shapes immediately, like DefineBlenderMesh() does
+            luxcore_scene.Parse(props)
+        except (OSError, ValueError, KeyError, RuntimeError) as error:
+            print("[Geometry Cache] Could not load entry %s: %s" % (key, error))
+            return None
+
+        return ExportedMesh(mesh_definitions)
+
+    def save(self, key, mesh_key, luxcore_scene, mesh_definitions):
+        if not self.can_save:
+            return
+
+        try:
+            with self.disk_cache.new_entry(key) as dirpath:
+                shapes = []
+
+                for i, (shape_name, mat_index) in enumerate(mesh_definitions):
+                    if not shape_name.startswith(mesh_key):
+                        raise ValueError("Unexpected shape name: " + shape_name)
+
+                    filename = "%d.ply" % i
+                    luxcore_scene.SaveMesh(shape_name, os.path.join(dirpath, filename))
+                    shapes.append([shape_name[len(mesh_key):], mat_index, filename])
+
+                with open(os.path.join(dirpath, MANIFEST_NAME), "w") as manifest_file:
+                    json.dump({"shapes": shapes}, manifest_file)
+        except AttributeError:
+            self.can_save = False
+            LuxCoreErrorLog.add_warning("Geometry cache: this LuxCore version can't save meshes")
+        except (OSError, ValueError, RuntimeError) as error:
+            print("[Geometry Cache] Could not save entry %s: %s" % (key, error))
+
+
+def hash_attribute(hasher, collection, attribute, dtype, components=1):
+    values = np.empty(len(collection) * components, dtype=dtype)
+    collection.foreach_get(attribute, values)
+    hasher.update(values.tobytes())
@@ -1,13 +1,20 @@
 from mathutils import Matrix
 import math
 import numpy as np
+from itertools import chain, cycle, repeat
 from .. import utils
 from ..utils import node as utils_node
 from ..bin import pyluxcore
 from .image import ImageExporter
+from .profiler import estimate_hair_memory
+from .hair_cache import HairCache, HairData
 from time import time
 from ..utils.errorlog import LuxCoreErrorLog
 
+# Number of strands that are collected at once, progress is reported and
+# cancellation is checked between the chunks
+STRAND_CHUNK_SIZE = 20000
+
 
 def find_psys_modifier(obj, psys):
     for mod in obj.modifiers:
@@ -16,6 +23,37 @@ def find_psys_modifier(obj, psys):
     return None
 
 
+def fill_chunked(buffer, values_per_strand, start, end, get_values, engine, msg):
+    """
+    Fill the buffer with the values of the strands from start to end, one chunk of strands at a time.
+    get_values(chunk_start, chunk_end) has to return an iterable with the values of these strands.
+    Returns False if the export was cancelled.
+    """
+    strands_count = end - start
+
+    for chunk_start in range(start, end, STRAND_CHUNK_SIZE):
+        chunk_end = min(chunk_start + STRAND_CHUNK_SIZE, end)
+
+        if engine:
+            if engine.test_break():
+                return False
+            done = chunk_start - start
+            engine.update_stats("Exporting...", "%s (%d%%)" % (msg, 100 * done // strands_count))
+
+        offset = (chunk_start - start) * values_per_strand
+        count = (chunk_end - chunk_start) * values_per_strand
+        buffer[offset:offset + count] = np.fromiter(get_values(chunk_start, chunk_end), dtype=np.float32, count=count)
+    return True
+
+
+def get_emitter_particles(psys, chunk_start, chunk_end, num_children):
+    """ The particles passed to uv_on_emitter() and mcol_on_emitter() for the strands in this chunk """
+    if num_children == 0:
+        return psys.particles[chunk_start:chunk_end]
+    # Children are looked up by particle_no, the particle argument is ignored
+    return repeat(psys.particles[0])
+
+
 def convert_uvs(obj, psys, settings, uv_textures, engine, strands_count, start, dupli_count, mod, num_children):
     failure = np.empty(shape=0, dtype=np.float32)
 
@@ -31,18 +69,17 @@ def convert_uvs(obj, psys, settings, uv_textures, engine, strands_count, start,
     if uv_index == -1 or not uv_textures[uv_index].data:
         return failure
 
-    if engine:
-        engine.update_stats("Exporting...", "[%s: %s] Preparing %d UV coordinates"
-                             % (obj.name, psys.name, strands_count))
-
-    first_particle = psys.particles[0]
+    msg = "[%s: %s] Preparing %d UV coordinates" % (obj.name, psys.name, strands_count)
+    # Calling the RNA function directly with map() avoids the overhead of a Python generator per strand
     f = psys.uv_on_emitter
-    uvs = np.fromiter((elem
-                       for i in range(start, dupli_count)
-                       for elem in f(mod, particle=psys.particles[i] if num_children == 0 else first_particle,
-                                     particle_no=i, uv_no=uv_index)),
-                      dtype=np.float32,
-                      count=(dupli_count - start) * 2)
+
+    def get_uvs(chunk_start, chunk_end):
+        particles = get_emitter_particles(psys, chunk_start, chunk_end, num_children)
+        return chain.from_iterable(map(f, repeat(mod), particles, range(chunk_start, chunk_end), repeat(uv_index)))
+
+    uvs = np.empty((dupli_count - start) * 2, dtype=np.float32)
+    if not fill_chunked(uvs, 2, start, dupli_count, get_uvs, engine, msg):
+        return None
     return uvs
 
 
@@ -61,18 +98,17 @@ def convert_colors(obj, psys, settings, vertex_colors, engine, strands_count, st
     if vertex_color_index == -1 or not vertex_colors[vertex_color_index].data:
         return failure
 
-    if engine:
-        engine.update_stats("Exporting...", "[%s: %s] Preparing %d vertex colors"
-                            % (obj.name, psys.name, strands_count))
-
-    first_particle = psys.particles[0]
+    msg = "[%s: %s] Preparing %d vertex colors" % (obj.name, psys.name, strands_count)
     f = psys.mcol_on_emitter
-    colors = np.fromiter((elem
-                          for i in range(start, dupli_count)
-                          for elem in f(mod, psys.particles[i] if num_children == 0 else first_particle,
-                                        particle_no= i, vcol_no=vertex_color_index)),
-                         dtype=np.float32,
-                         count=(dupli_count - start) * 3)
+
+    def get_colors(chunk_start, chunk_end):
+        particles = get_emitter_particles(psys, chunk_start, chunk_end, num_children)
+        return chain.from_iterable(map(f, repeat(mod), particles, range(chunk_start, chunk_end),
+                                       repeat(vertex_color_index)))
+
+    colors = np.empty((dupli_count - start) * 3, dtype=np.float32)
+    if not fill_chunked(colors, 3, start, dupli_count, get_colors, engine, msg):
+        return None
     return colors
 
 
@@ -86,6 +122,66 @@ def warn_about_missing_uvs(obj, node_tree):
         LuxCoreErrorLog.add_warning(msg, obj_name=obj.name)
 
 
+def collect_hair_data(obj, psys, settings, depsgraph, scene, engine, mod,
+                      points_per_strand, start, dupli_count, num_children):
+    """
+    Collect the strand points, colors and UVs of a particle system from Blender.
+    Returns a HairData instance, or None if the export was cancelled.
+    """
+    # Collect point/color/uv information from Blender
+    # (unfortunately this can't be accelerated in C++)
+    collection_start = time()
+    strands_count = dupli_count - start
+
+    # Point coordinates as a flattened numpy array
+    point_count = strands_count * points_per_strand
+    msg = "[%s: %s] Preparing %d points" % (obj.name, psys.name, point_count)
+    co_hair = psys.co_hair
+    steps = range(points_per_strand)
+
+    def get_points(chunk_start, chunk_end):
+        # Calling co_hair directly with map() avoids the overhead of a Python generator per point
+        particle_numbers = chain.from_iterable(repeat(pindex, points_per_strand)
+                                               for pindex in range(chunk_start, chunk_end))
+        return chain.from_iterable(map(co_hair, repeat(obj), particle_numbers, cycle(steps)))
+
+    points = np.empty(point_count * 3, dtype=np.float32)
+    if not fill_chunked(points, points_per_strand * 3, start, dupli_count, get_points, engine, msg):
+        return None
+
+    colors = np.empty(shape=0, dtype=np.float32)
+    uvs = np.empty(shape=0, dtype=np.float32)
+    uvs_needed = settings.copy_uv_coords
+    copy_uvs = settings.copy_uv_coords
+
+    if settings.export_color != "none" or uvs_needed:
+        emitter_mesh = obj.to_mesh(depsgraph=depsgraph)
+        uv_textures = emitter_mesh.uv_layers
+        vertex_colors = emitter_mesh.vertex_colors
+
+        if settings.export_color == "uv_texture_map" and settings.image:
+            uvs_needed = True
+        elif settings.export_color == "vertex_color":
+            colors = convert_colors(obj, psys, settings, vertex_colors, engine,
+                                    strands_count, start, dupli_count, mod, num_children)
+
+        if uvs_needed:
+            uvs = convert_uvs(obj, psys, settings, uv_textures, engine,
+                              strands_count, start, dupli_count, mod, num_children)
+
+        obj.to_mesh_clear()
+
+        if colors is None or uvs is None:
+            # Cancelled by the user
+            return None
+
+    if len(uvs) == 0:
+        copy_uvs = False
+
+    print("Collecting Blender hair information took %.3f s" % (time() - collection_start))
+    return HairData(points, colors, uvs, copy_uvs)
+
+
 def convert_hair(exporter, obj, obj_key, psys, depsgraph, luxcore_scene, scene_props, is_viewport_render,
                  is_for_duplication, instance_matrix_world, visible_to_camera, engine=None):
     try:
@@ -127,60 +223,45 @@ def convert_hair(exporter, obj, obj_key, psys, depsgraph, luxcore_scene, scene_p
                                              * psys.settings.child_nbr * num_parents)
             start = num_parents + num_virtual_parents
 
-        # Collect point/color/uv information from Blender
-        # (unfortunately this can't be accelerated in C++)
-        collection_start = time()
         strands_count = dupli_count - start
-
-        # Point coordinates as a flattened numpy array
         point_count = strands_count * points_per_strand
-        if engine:
-            engine.update_stats("Exporting...", "[%s: %s] Preparing %d points"
-                                % (obj.name, psys.name, point_count))
-        co_hair = psys.co_hair
-        points = np.fromiter((elem
-                              for pindex in range(start, dupli_count)
-                              for step in range(points_per_strand)
-                              for elem in co_hair(object=obj, particle_no=pindex, step=step)),
-                             dtype=np.float32,
-                             count=point_count * 3)
-
-        colors = np.empty(shape=0, dtype=np.float32)
-        uvs = np.empty(shape=0, dtype=np.float32)
+
+        cache_key = None
+        hair_data = None
+        hair_cache_settings = scene.luxcore.config.hair_cache
+
+        if hair_cache_settings.enabled and not is_viewport_render:
+            cache_key = HairCache.make_key(obj, psys, scene, is_viewport_render)
+            hair_data = HairCache.get(cache_key)
+            if exporter.stats:
+                if hair_data:
+                    exporter.stats.hair_cache_hits.value += 1
+                else:
+                    exporter.stats.hair_cache_misses.value += 1
+
+        if hair_data is None:
+            hair_data = collect_hair_data(obj, psys, settings, depsgraph, scene, engine, mod,
+                                          points_per_strand, start, dupli_count, num_children)
+            if hair_data is None:
+                # Cancelled by the user
+                return None
+            if cache_key:
+                HairCache.add(cache_key, hair_data, hair_cache_settings.max_size * 1024 * 1024)
+
+        # The image is exported again even if the hair data is cached, because the
+        # file of a packed or generated image is deleted after each render
         image_filename = ""
-        uvs_needed = settings.copy_uv_coords
-        copy_uvs = settings.copy_uv_coords
-
-        if settings.export_color != "none" or uvs_needed:
-            emitter_mesh = obj.to_mesh(depsgraph=depsgraph)
-            uv_textures = emitter_mesh.uv_layers
-            vertex_colors = emitter_mesh.vertex_colors
-
-            if settings.export_color == "uv_texture_map" and settings.image:
-                try:
-                    image_filename = ImageExporter.export(settings.image, settings.image_user, scene)
-                    uvs_needed = True
-                except OSError as error:
-                    msg = "%s (Object: %s, Particle System: %s)" % (error, obj.name, psys.name)
-                    LuxCoreErrorLog.add_warning(msg, obj_name=obj.name)
-            elif settings.export_color == "vertex_color":
-                colors = convert_colors(obj, psys, settings, vertex_colors, engine,
-                                        strands_count, start, dupli_count, mod, num_children)
-
-            if uvs_needed:
-                uvs = convert_uvs(obj, psys, settings, uv_textures, engine,
-                                  strands_count, start, dupli_count, mod, num_children)
-
-            obj.to_mesh_clear()
-
-        if len(uvs) == 0:
-            copy_uvs = False
-
-        print("Collecting Blender hair information took %.3f s" % (time() - collection_start))
+        if settings.export_color == "uv_texture_map" and settings.image:
+            try:
+                image_filename = ImageExporter.export(settings.image, settings.image_user, scene)
+            except OSError as error:
+                msg = "%s (Object: %s, Particle System: %s)" % (error, obj.name, psys.name)
+                LuxCoreErrorLog.add_warning(msg, obj_name=obj.name)
+
         if engine:
             engine.update_stats("Exporting...", "Refining Hair System %s" % psys.name)
             if engine.test_break():
-                return None, None
+                return None
 
         lux_shape_name = make_hair_shape_name(obj_key, psys)
         lux_obj_name = lux_shape_name
@@ -192,8 +273,9 @@ def convert_hair(exporter, obj, obj_key, psys, depsgraph, luxcore_scene, scene_p
             transformation = None
 
         success = luxcore_scene.DefineBlenderStrands(lux_shape_name, points_per_strand,
-                                                     points, colors, uvs, image_filename, settings.gamma,
-                                                     copy_uvs, transformation, strand_diameter,
+                                                     hair_data.points, hair_data.colors, hair_data.uvs,
+                                                     image_filename, settings.gamma,
+                                                     hair_data.copy_uvs, transformation, strand_diameter,
                                                      root_width, tip_width, width_offset,
                                                      settings.tesseltype, settings.adaptive_maxdepth,
                                                      settings.adaptive_error, settings.solid_sidecount,
@@ -203,11 +285,15 @@ def convert_hair(exporter, obj, obj_key, psys, depsgraph, luxcore_scene, scene_p
         # Sometimes no hair shape could be created, e.g. if the length
         # of all hairs is 0 (can happen e.g. during animations or if hair length is textured)
         if not success:
-            return None, None
+            return None
 
         time_elapsed = time() - start_time
         if exporter.stats:
             exporter.stats.export_time_hair.value += time_elapsed
+        if exporter.profiler:
+            exporter.profiler.add_hair(obj.name, strands_count,
+                                       estimate_hair_memory(point_count, len(hair_data.colors) > 0,
+                                                            len(hair_data.uvs) > 0))
         print("[%s: %s] Hair export finished (%.3f s)" % (obj.name, psys.name, time_elapsed))
         return lux_shape_name
     except Exception as error:
@@ -215,7 +301,7 @@ def convert_hair(exporter, obj, obj_key, psys, depsgraph, luxcore_scene, scene_p
         LuxCoreErrorLog.add_warning(msg, obj_name=obj.name)
         import traceback
         traceback.print_exc()
-        return None, None
+        return None
 
 
 def set_hair_props(scene_props, lux_obj, lux_shape, lux_mat, visible_to_camera,
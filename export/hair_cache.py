@@ -0,0 +1,148 @@
+import bpy
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from .geometry_cache import hash_attribute
+
+# Property types that are part of the fingerprint of a particle system (pointers and collections are skipped)
+FINGERPRINT_PROPERTY_TYPES = {"BOOLEAN", "INT", "FLOAT", "STRING", "ENUM"}
+# Curve mappings of the particle settings that shape the child hairs
+CURVE_MAPPING_NAMES = ("clump_curve", "roughness_curve", "twist_curve")
+
+
+class HairData:
+    """ The strand data collected from Blender, ready to be passed to DefineBlenderStrands() """
+
+    def __init__(self, points, colors, uvs, copy_uvs):
+        self.points = points
+        self.colors = colors
+        self.uvs = uvs
+        self.copy_uvs = copy_uvs
+
+    @property
+    def nbytes(self):
+        return self.points.nbytes + self.colors.nbytes + self.uvs.nbytes
+
+
+class HairCache:
+    """
+    This class is a singleton.
+    Keeps the strand data of hair systems in memory between frames and renders, so static
+    hair has to be collected from Blender (the slowest part of the hair export) only once.
+    Entries are keyed by a fingerprint of the particle system, its settings and its emitter.
+    When the size limit is exceeded, the least recently used entries are deleted.
+    """
+    # {key: HairData}, the least recently used entry first
+    entries = OrderedDict()
+    # In bytes
+    size = 0
+
+    @classmethod
+    def get(cls, key):
+        try:
+            hair_data = cls.entries[key]
+        except KeyError:
+            return None
+        cls.entries.move_to_end(key)
+        return hair_data
+
+    @classmethod
+    def add(cls, key, hair_data, max_size):
+        old_hair_data = cls.entries.pop(key, None)
+        if old_hair_data:
+            cls.size -= old_hair_data.nbytes
+
+        cls.entries[key] = hair_data
+        cls.size += hair_data.nbytes
+
+        while cls.size > max_size and cls.entries:
+            _, removed = cls.entries.popitem(last=False)
+            cls.size -= removed.nbytes
+
+    @classmethod
+    def clear(cls):
+        cls.entries.clear()
+        cls.size = 0
+
+    @staticmethod
+    def make_key(obj, psys, scene, is_viewport_render):
+        """
+        Hash everything that influences the collected strand data. Much cheaper than collecting the data.
+        obj has to be the evaluated emitter object.
+        """
+        settings = psys.settings
+        hair_settings = settings.luxcore.hair
+        image = hair_settings.image
+
+        hasher = hashlib.md5()
+        state = [
+            bpy.app.version, obj.name_full, psys.name, is_viewport_render, psys.seed, psys.child_seed,
+            # The points are in world space
+            [list(row) for row in obj.matrix_world],
+            # Contains the names of the vertex groups (density, length, clump etc.)
+            _get_property_values(psys),
+            _get_property_values(settings),
+            [_get_curve_mapping_values(getattr(settings, name)) for name in CURVE_MAPPING_NAMES],
+            _get_vertex_group_weights(obj, psys),
+            _get_property_values(hair_settings),
+            (image.name_full, image.filepath, hair_settings.image_user.frame_current) if image else None,
+        ]
+        if psys.use_hair_dynamics or any(settings.texture_slots):
+            # The hair can change from frame to frame, even if nothing else changes
+            state.append(scene.frame_current)
+        hasher.update(repr(state).encode())
+
+        mesh = obj.data
+        hash_attribute(hasher, mesh.vertices, "co", np.float32, 3)
+        hash_attribute(hasher, mesh.polygons, "loop_total", np.int32)
+        if hair_settings.export_color != "none" or hair_settings.copy_uv_coords:
+            for uv_layer in mesh.uv_layers:
+                hash_attribute(hasher, uv_layer.data, "uv", np.float32, 2)
+            for vertex_colors in mesh.vertex_colors:
+                hash_attribute(hasher, vertex_colors.data, "color", np.float32, 4)
+
+        # The guide hairs (parents), the children are generated from them
+        for particle in psys.particles:
+            hash_attribute(hasher, particle.hair_keys, "co", np.float32, 3)
+
+        return hasher.hexdigest()
+
+
+def _get_property_values(struct):
+    values = []
+    for prop in struct.bl_rna.properties:
+        if prop.type not in FINGERPRINT_PROPERTY_TYPES:
+            continue
+        value = getattr(struct, prop.identifier)
+        if getattr(prop, "is_array", False):
+            value = tuple(value)
+        values.append((prop.identifier, value))
+    return values
+
+
+def _get_curve_mapping_values(curve_mapping):
+    if curve_mapping is None:
+        return None
+    return [
+        curve_mapping.use_clip, curve_mapping.clip_min_x, curve_mapping.clip_min_y,
+        curve_mapping.clip_max_x, curve_mapping.clip_max_y,
+        [[(tuple(point.location), point.handle_type) for point in curve.points] for curve in curve_mapping.curves],
+    ]
+
+
+def _get_vertex_group_weights(obj, psys):
+    """ The weights of all vertex groups of the emitter that are used by the particle system """
+    group_indices = set()
+    for prop in psys.bl_rna.properties:
+        if prop.identifier.startswith("vertex_group_"):
+            vertex_group = obj.vertex_groups.get(getattr(psys, prop.identifier))
+            if vertex_group:
+                group_indices.add(vertex_group.index)
+
+    if not group_indices:
+        return None
+
+    # There is no foreach_get() for the vertex group weights, so this is only done if groups are used
+    return [(vertex.index, group.group, group.weight)
+            for vertex in obj.data.vertices for group in vertex.groups
+            if group.group in group_indices]
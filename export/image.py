@@ -1,7 +1,17 @@
 import bpy
 import tempfile
+import hashlib
 import os
 from .. import utils
+from ..utils import image_sequence_index
+from ..utils.disk_cache import DiskCache
+
+# Increase this number if the way images are extracted changes, so old cache entries are not used anymore
+IMAGE_CACHE_VERSION = 1
+
+
+def get_default_cache_directory():
+    return os.path.join(tempfile.gettempdir(), "luxcore_image_cache")
 
 
 class ImageExporter(object):
@@ -9,9 +19,15 @@ class ImageExporter(object):
     This class is a singleton
     """
     temp_images = {}
+    # Images stored in the image cache in this session, {key: filepath}
+    cached_images = {}
+    image_cache = None
+    # Hashes of the packed image data, kept between sessions so each packed image is only hashed once.
+    # {(image name, packed file address, packed size): hash}, cleared when a .blend file is loaded
+    packed_file_hashes = {}
 
     @classmethod
-    def _save_to_temp_file(cls, image):
+    def _save_to_temp_file(cls, image, scene=None):
         # Note: We can't use utils.make_key(image) here because the memory address
         # might be re-used on undo, causing a key collision
         if image.filepath_raw:
@@ -21,41 +37,111 @@ class ImageExporter(object):
 
         if key in cls.temp_images:
             # Image was already exported
-            temp_image = cls.temp_images[key]
-        else:
-            if image.filepath_raw:
-                _, extension = os.path.splitext(image.filepath_raw)
-            else:
-                # Generated images do not have a filepath, fallback to file_format
-                extension = "." + image.file_format.lower()
+            return cls.temp_images[key].name
 
-            temp_image = tempfile.NamedTemporaryFile(delete=False, suffix=extension)
+        filepath = cls.cached_images.get(key)
+        if filepath and os.path.isfile(filepath):
+            return filepath
 
-            print('Unpacking image "%s" to temp file "%s"' % (image.name, temp_image.name))
-            orig_filepath = image.filepath_raw
-            orig_source = image.source
-            image.filepath_raw = temp_image.name
+        if image.filepath_raw:
+            _, extension = os.path.splitext(image.filepath_raw)
+        else:
+            # Generated images do not have a filepath, fallback to file_format
+            extension = "." + image.file_format.lower()
 
-            try:
-                image.save()
-            except RuntimeError as error:
-                raise OSError(str(error))
-            finally:
-                # The changes above altered the source to "FILE", so we have to restore the original source
-                image.filepath_raw = orig_filepath
-                image.source = orig_source
+        image_cache = cls._get_image_cache(scene)
+        # Generated and modified images would have to be hashed pixel by pixel, which is too slow
+        if image_cache and image.packed_file and not image.is_dirty:
+            filepath = cls._save_to_image_cache(image, image_cache, extension)
+            cls.cached_images[key] = filepath
+            return filepath
+
+        temp_image = tempfile.NamedTemporaryFile(delete=False, suffix=extension)
+        print('Unpacking image "%s" to temp file "%s"' % (image.name, temp_image.name))
+        cls._save_image(image, temp_image.name)
 
-            # Only store the key once we are sure that everything went OK
-            cls.temp_images[key] = temp_image
+        # Only store the key once we are sure that everything went OK
+        cls.temp_images[key] = temp_image
         return temp_image.name
 
+    @staticmethod
+    def _save_image(image, filepath):
+        orig_filepath = image.filepath_raw
+        orig_source = image.source
+        image.filepath_raw = filepath
+
+        try:
+            image.save()
+        except RuntimeError as error:
+            raise OSError(str(error))
+        finally:
+            # The changes above altered the source to "FILE", so we have to restore the original source
+            image.filepath_raw = orig_filepath
+            image.source = orig_source
+
+    @classmethod
+    def _get_image_cache(cls, scene):
+        if scene is None:
+            return None
+        settings = scene.luxcore.config.image_cache
+        if not settings.enabled:
+            return None
+
+        if settings.directory:
+            dirpath = utils.get_abspath(settings.directory)
+        else:
+            dirpath = get_default_cache_directory()
+
+        if cls.image_cache is None or cls.image_cache.dirpath != dirpath:
+            cls.image_cache = DiskCache(dirpath, 0)
+        cls.image_cache.max_size = settings.max_size * 1024 * 1024
+        return cls.image_cache
+
+    @classmethod
+    def _save_to_image_cache(cls, image, image_cache, extension):
+        """ Only used for packed images that were not modified after packing, they are stored unchanged """
+        key = cls._make_cache_key(image, extension)
+        filename = "image" + extension
+
+        dirpath = image_cache.get(key)
+        if dirpath:
+            return os.path.join(dirpath, filename)
+
+        print('Unpacking image "%s" to image cache (key %s)' % (image.name, key))
+        with image_cache.new_entry(key) as temp_dirpath:
+            with open(os.path.join(temp_dirpath, filename), "wb") as image_file:
+                image_file.write(image.packed_file.data)
+        return os.path.join(image_cache.dirpath, key, filename)
+
+    @classmethod
+    def _make_cache_key(cls, image, extension):
+        hasher = hashlib.md5()
+        hasher.update(repr((IMAGE_CACHE_VERSION, extension, cls.get_packed_file_hash(image))).encode())
+        return hasher.hexdigest()
+
+    @classmethod
+    def get_packed_file_hash(cls, image):
+        """ Hash of the packed data of the image, only computed again if the image is re-packed """
+        packed_file = image.packed_file
+        identity = (image.name_full, packed_file.as_pointer(), packed_file.size)
+        packed_file_hash = cls.packed_file_hashes.get(identity)
+        if packed_file_hash is None:
+            packed_file_hash = hashlib.md5(packed_file.data).hexdigest()
+            cls.packed_file_hashes[identity] = packed_file_hash
+        return packed_file_hash
+
+    @classmethod
+    def enforce_cache_size_limit(cls):
+        if cls.image_cache and cls.cached_images:
+            cls.image_cache.enforce_size_limit()
+
     @classmethod
     def export(cls, image, image_user, scene):
         if image.source == "GENERATED":
-            return cls._save_to_temp_file(image)
+            return cls._save_to_temp_file(image, scene)
         elif image.source == "FILE":
             if image.packed_file:
-                return cls._save_to_temp_file(image)
+                return cls._save_to_temp_file(image, scene)
             else:
                 try:
                     filepath = utils.get_abspath(image.filepath, library=image.library,
@@ -72,15 +158,11 @@ class ImageExporter(object):
             except ValueError as error:
                 raise OSError(str(error))
 
-            indexed_filepaths = utils.image_sequence_resolve_all(image)
             try:
-                if frame < 1:
-                    raise IndexError
-                index, filepath = indexed_filepaths[frame - 1]
-                return filepath
+                return image_sequence_index.get_filepath(image, frame)
             except IndexError:
                 raise OSError('Frame %d in image sequence "%s" does not exist (contains only %d frames)'
-                              % (frame, image.name, len(indexed_filepaths)))
+                              % (frame, image.name, len(image_sequence_index.get_sequence(image))))
         else:
             raise Exception('Unsupported image source "%s" in image "%s"' % (image.source, image.name))
 
@@ -113,4 +195,6 @@ class ImageExporter(object):
             os.remove(filepath)
 
         cls.temp_images.clear()
+        # The files in the image cache are kept for later sessions
+        cls.cached_images.clear()
 
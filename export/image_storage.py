@@ -0,0 +1,253 @@
+import os
+import struct
+from collections import namedtuple
+
+# Bits per channel of formats that don't need to be inspected
+BYTE_EXTENSIONS = {".jpg", ".jpeg", ".bmp", ".tga", ".gif"}
+FLOAT_EXTENSIONS = {".exr", ".hdr"}
+# Bytes per channel of the LuxCore imagemap storage types
+STORAGE_BYTES = {
+    "byte": 1,
+    "half": 2,
+    "float": 4,
+}
+# Number of channels used by the LuxCore imagemap channel setting ("default" keeps the channels of the file)
+CHANNEL_COUNTS = {
+    "rgb": 3,
+    "directx2opengl_normalmap": 3,
+    "red": 1,
+    "green": 1,
+    "blue": 1,
+    "alpha": 1,
+    "mean": 1,
+    "colored_mean": 1,
+}
+# PNG color type: channel count
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+# JPEG start of frame markers (without DHT, JPG and DAC, which share the range)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# OpenEXR pixel type: bits (UINT, HALF, FLOAT)
+EXR_PIXEL_TYPE_BITS = {0: 32, 1: 16, 2: 32}
+# TIFF field type: (struct format, size in bytes) of the types used by the tags we read (SHORT, LONG)
+TIFF_FIELD_TYPES = {3: ("H", 2), 4: ("I", 4)}
+TIFF_TAG_WIDTH = 256
+TIFF_TAG_HEIGHT = 257
+TIFF_TAG_BITS_PER_SAMPLE = 258
+TIFF_TAG_SAMPLES_PER_PIXEL = 277
+
+# width and height are None if they are unknown
+ImageInfo = namedtuple("ImageInfo", ["width", "height", "channels", "bits"])
+
+
+def get_image_info(image, filepath):
+    """
+    Find out the resolution, channel count and bit depth of an image without loading it.
+    Only the file header is read, the Blender image is only used if its pixels are already loaded.
+    Returns None if nothing is known about the image.
+    """
+    _, extension = os.path.splitext(filepath)
+    extension = extension.lower()
+
+    try:
+        if extension == ".png":
+            return _read_png_header(filepath)
+        if extension in {".jpg", ".jpeg"}:
+            return _read_jpeg_header(filepath)
+        if extension == ".exr":
+            return _read_exr_header(filepath)
+        if extension == ".hdr":
+            return _read_hdr_header(filepath)
+        if extension in {".tif", ".tiff"}:
+            return _read_tiff_header(filepath)
+    except (OSError, struct.error, ValueError, KeyError) as error:
+        print('Could not read header of image "%s": %s' % (filepath, error))
+
+    # Accessing the size would load the image in Blender if it is not loaded yet
+    if image and image.has_data:
+        width, height = image.size
+        return ImageInfo(width, height, image.channels, 32 if image.is_float else 8)
+
+    if extension in BYTE_EXTENSIONS:
+        return ImageInfo(None, None, None, 8)
+    if extension in FLOAT_EXTENSIONS:
+        return ImageInfo(None, None, None, 32)
+    return None
+
+
+def select_storage(info, channel, is_color_output):
+    """
+    Pick a LuxCore imagemap storage for an image that does not lose precision: byte for 8 bit images.
+    Images with a higher bit depth are left to LuxCore, because half precision clips values
+    above 65504 (e.g. the sun in HDRIs) and loses precision in displacement and other data maps.
+    Returns a tuple (storage, channel), storage is None if LuxCore should decide.
+    If only the color of an image with alpha channel is used, the alpha channel is dropped.
+    """
+    if info is None:
+        return None, channel
+
+    if channel == "default" and is_color_output and info.channels == 4:
+        channel = "rgb"
+
+    storage = "byte" if info.bits <= 8 else None
+    return storage, channel
+
+
+def estimate_memory(info, storage, channel):
+    """
+    Estimate (in bytes) how much memory LuxCore needs for the image.
+    Returns 0 if the resolution of the image is unknown.
+    """
+    if info is None or info.width is None or info.channels is None:
+        return 0
+
+    channel_count = CHANNEL_COUNTS.get(channel, info.channels)
+    try:
+        bytes_per_channel = STORAGE_BYTES[storage]
+    except KeyError:
+        # LuxCore decides, assume it keeps the precision of the file
+        bytes_per_channel = 1 if info.bits <= 8 else (2 if info.bits <= 16 else 4)
+    return info.width * info.height * channel_count * bytes_per_channel
+
+
+def estimate_saved_memory(info, storage, channel):
+    """
+    Estimate (in bytes) how much memory is saved compared to the storage
+    LuxCore would pick by default (all channels of the file in its precision)
+    """
+    if info is None or info.width is None or info.channels is None:
+        return 0
+
+    default_memory = estimate_memory(info, None, "default")
+    return max(0, default_memory - estimate_memory(info, storage, channel))
+
+
+def _read_png_header(filepath):
+    with open(filepath, "rb") as image_file:
+        header = image_file.read(26)
+
+    if header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        raise ValueError("Not a PNG file")
+
+    width, height, bits, color_type = struct.unpack(">IIBB", header[16:26])
+    return ImageInfo(width, height, PNG_CHANNELS[color_type], bits)
+
+
+def _read_jpeg_header(filepath):
+    with open(filepath, "rb") as image_file:
+        if image_file.read(2) != b"\xff\xd8":
+            raise ValueError("Not a JPEG file")
+
+        while True:
+            marker_start, marker, length = struct.unpack(">BBH", image_file.read(4))
+            if marker_start != 0xFF:
+                raise ValueError("Invalid JPEG marker")
+
+            if marker in JPEG_SOF_MARKERS:
+                bits, height, width, channels = struct.unpack(">BHHB", image_file.read(6))
+                return ImageInfo(width, height, channels, bits)
+
+            # Skip the segment (the length includes the two length bytes)
+            image_file.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_exr_header(filepath):
+    with open(filepath, "rb") as image_file:
+        magic, version = struct.unpack("<II", image_file.read(8))
+        if magic != 20000630:
+            raise ValueError("Not an OpenEXR file")
+
+        width = height = channels = None
+        bits = 0
+
+        # The header is a list of attributes (name, type, size, value), terminated by an empty name
+        while True:
+            name = _read_null_terminated(image_file)
+            if not name:
+                break
+            attribute_type = _read_null_terminated(image_file)
+            size, = struct.unpack("<i", image_file.read(4))
+            value = image_file.read(size)
+
+            if name == b"dataWindow" and attribute_type == b"box2i":
+                x_min, y_min, x_max, y_max = struct.unpack("<iiii", value)
+                width, height = x_max - x_min + 1, y_max - y_min + 1
+            elif name == b"channels" and attribute_type == b"chlist":
+                channels = 0
+                offset = 0
+                # Each channel: name, pixel type, pLinear, 3 reserved bytes, x and y sampling
+                while value[offset] != 0:
+                    offset = value.index(b"\0", offset) + 1
+                    pixel_type, = struct.unpack_from("<i", value, offset)
+                    bits = max(bits, EXR_PIXEL_TYPE_BITS[pixel_type])
+                    channels += 1
+                    offset += 16
+
+    if width is None or channels is None:
+        raise ValueError("Incomplete OpenEXR header")
+    return ImageInfo(width, height, channels, bits)
+
+
+def _read_hdr_header(filepath):
+    with open(filepath, "rb") as image_file:
+        if not image_file.readline().startswith(b"#?"):
+            raise ValueError("Not a Radiance HDR file")
+
+        # The header ends with an empty line, followed by the resolution (e.g. "-Y 512 +X 1024")
+        while image_file.readline().strip():
+            pass
+        resolution = image_file.readline().split()
+
+    if len(resolution) != 4:
+        raise ValueError("Invalid Radiance HDR resolution")
+    sizes = {resolution[0][1:2]: int(resolution[1]), resolution[2][1:2]: int(resolution[3])}
+    return ImageInfo(sizes[b"X"], sizes[b"Y"], 3, 32)
+
+
+def _read_tiff_header(filepath):
+    with open(filepath, "rb") as image_file:
+        byte_order = image_file.read(2)
+        if byte_order == b"II":
+            endian = "<"
+        elif byte_order == b"MM":
+            endian = ">"
+        else:
+            raise ValueError("Not a TIFF file")
+
+        magic, ifd_offset = struct.unpack(endian + "HI", image_file.read(6))
+        if magic != 42:
+            raise ValueError("Not a TIFF file")
+
+        image_file.seek(ifd_offset)
+        entry_count, = struct.unpack(endian + "H", image_file.read(2))
+        tags = {}
+        for _ in range(entry_count):
+            tag, field_type, count, value = struct.unpack(endian + "HHI4s", image_file.read(12))
+            if field_type not in TIFF_FIELD_TYPES:
+                continue
+            value_format, value_size = TIFF_FIELD_TYPES[field_type]
+            if count * value_size <= 4:
+                tags[tag] = struct.unpack_from(endian + value_format * count, value)
+            else:
+                # The values are stored elsewhere, the first one is enough for our purpose
+                offset, = struct.unpack(endian + "I", value)
+                position = image_file.tell()
+                image_file.seek(offset)
+                tags[tag] = struct.unpack(endian + value_format, image_file.read(value_size))
+                image_file.seek(position)
+
+    width = tags[TIFF_TAG_WIDTH][0]
+    height = tags[TIFF_TAG_HEIGHT][0]
+    channels = tags.get(TIFF_TAG_SAMPLES_PER_PIXEL, (1,))[0]
+    bits = tags.get(TIFF_TAG_BITS_PER_SAMPLE, (1,))[0]
+    return ImageInfo(width, height, channels, bits)
+
+
+def _read_null_terminated(image_file):
+    chars = []
+    while True:
+        char = image_file.read(1)
+        if not char:
+            raise ValueError("Unexpected end of file")
+        if char == b"\0":
+            return b"".join(chars)
+        chars.append(char)
@@ -3,12 +3,14 @@ from .. import utils
 from ..nodes.output import get_active_output
 from ..utils.errorlog import LuxCoreErrorLog
 from . import cycles_node_reader
+from time import time
 
 
 GLOBAL_FALLBACK_MAT = "__CLAY__"
 
 
 def convert(exporter, depsgraph, material, is_viewport_render, obj_name=""):
+    start_time = time()
     try:
         if material is None:
             return fallback()
@@ -46,6 +48,9 @@ def convert(exporter, depsgraph, material, is_viewport_render, obj_name=""):
         import traceback
         traceback.print_exc()
         return fallback()
+    finally:
+        if material and exporter.profiler:
+            exporter.profiler.add_material(material.name, time() - start_time)
 
 
 def fallback(luxcore_name=GLOBAL_FALLBACK_MAT):
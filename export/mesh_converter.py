@@ -1,6 +1,7 @@
 import bpy
 from contextlib import contextmanager
 from .caches.exported_data import ExportedMesh
+from .profiler import estimate_mesh_memory
 from time import time
 from .. import utils
 from ..utils.errorlog import LuxCoreErrorLog
@@ -17,10 +18,32 @@ def custom_normals_supported():
 
 def convert(obj, mesh_key, depsgraph, luxcore_scene, is_viewport_render, use_instancing, transform, exporter=None):
     start_time = time()
+    geometry_cache = exporter.geometry_cache if exporter else None
     
     with _prepare_mesh(obj, depsgraph) as mesh:
         if mesh is None:
             return None
+
+        material_count = max(1, len(mesh.materials))
+
+        if is_viewport_render or use_instancing:
+            mesh_transform = None
+        else:
+            mesh_transform = utils.matrix_to_list(transform)
+
+        cache_key = None
+        if geometry_cache and geometry_cache.can_cache(mesh):
+            cache_key = geometry_cache.make_key(mesh, material_count, mesh_transform)
+            exported_mesh = geometry_cache.load(cache_key, mesh_key, luxcore_scene)
+
+            if exported_mesh:
+                if exporter.stats:
+                    exporter.stats.export_time_meshes.value += time() - start_time
+                    exporter.stats.geometry_cache_hits.value += 1
+                return exported_mesh
+
+        if not _tessellate(mesh):
+            return None
         
         if mesh.has_custom_normals and not custom_normals_supported():
             LuxCoreErrorLog.add_warning("Custom normals not supported for this Blender version", obj_name=obj.name)
@@ -46,20 +69,22 @@ def convert(obj, mesh_key, depsgraph, luxcore_scene, is_viewport_render, use_ins
             loopColsPtrList.append(0)
 
         meshPtr = mesh.as_pointer()
-        material_count = max(1, len(mesh.materials))
-
-        if is_viewport_render or use_instancing:
-            mesh_transform = None
-        else:
-            mesh_transform = utils.matrix_to_list(transform)
 
         mesh_definitions = luxcore_scene.DefineBlenderMesh(mesh_key, loopTriCount, loopTriPtr, loopPtr,
                                                            vertPtr, polyPtr, loopUVsPtrList, loopColsPtrList,
                                                            meshPtr, material_count, mesh_transform,
                                                            bpy.app.version)
+
+        if cache_key:
+            geometry_cache.save(cache_key, mesh_key, luxcore_scene, mesh_definitions)
         
         if exporter and exporter.stats:
             exporter.stats.export_time_meshes.value += time() - start_time
+
+        if exporter and exporter.profiler:
+            memory_estimate = estimate_mesh_memory(len(mesh.vertices), loopTriCount,
+                                                   len(mesh.uv_layers), len(mesh.vertex_colors))
+            exporter.profiler.add_mesh(obj.name, loopTriCount, memory_estimate)
         
         return ExportedMesh(mesh_definitions)
 
@@ -70,11 +95,12 @@ def _prepare_mesh(obj, depsgraph):
     Create a temporary mesh from an object.
     The mesh is guaranteed to be removed when the calling block ends.
     Can return None if no mesh could be created from the object (e.g. for empties)
+    The mesh is not tessellated yet, call _tessellate() before accessing the loop triangles.
 
     Use it like this:
 
-    with mesh_converter.convert(obj, depsgraph) as mesh:
-        if mesh:
+    with _prepare_mesh(obj, depsgraph) as mesh:
+        if mesh and _tessellate(mesh):
             print(mesh.name)
             ...
     """
@@ -87,30 +113,35 @@ def _prepare_mesh(obj, depsgraph):
         if object_eval:
             mesh = object_eval.to_mesh()
 
-            if mesh:
-                # TODO test if this makes sense
-                # If negative scaling, we have to invert the normals
-                # if not mesh.has_custom_normals and object_eval.matrix_world.determinant() < 0.0:
-                #     # Does not handle custom normals
-                #     mesh.flip_normals()
-                
-                mesh.calc_loop_triangles()
-                if not mesh.loop_triangles:
-                    object_eval.to_mesh_clear()
-                    mesh = None
-
-            if mesh:
-                if mesh.use_auto_smooth:
-                    if not mesh.has_custom_normals:
-                        mesh.calc_normals()
-                    mesh.split_faces()
-                
-                mesh.calc_loop_triangles()
-                
-                if mesh.has_custom_normals:
-                    mesh.calc_normals_split()
-
         yield mesh
     finally:
         if object_eval and mesh:
             object_eval.to_mesh_clear()
+
+
+def _tessellate(mesh):
+    """
+    Calculate the loop triangles and split normals of the mesh.
+    Returns False if the mesh has no faces.
+    """
+    # TODO test if this makes sense
+    # If negative scaling, we have to invert the normals
+    # if not mesh.has_custom_normals and object_eval.matrix_world.determinant() < 0.0:
+    #     # Does not handle custom normals
+    #     mesh.flip_normals()
+
+    mesh.calc_loop_triangles()
+    if not mesh.loop_triangles:
+        return False
+
+    if mesh.use_auto_smooth:
+        if not mesh.has_custom_normals:
+            mesh.calc_normals()
+        mesh.split_faces()
+
+    mesh.calc_loop_triangles()
+
+    if mesh.has_custom_normals:
+        mesh.calc_normals_split()
+
+    return True
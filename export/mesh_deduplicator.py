@@ -0,0 +1,94 @@
+from .geometry_cache import GeometryCache
+
+
+class MeshDeduplicator:
+    """
+    Finds mesh objects with identical evaluated geometry, even if they use different mesh
+    datablocks (e.g. because the same asset was imported or appended several times),
+    so the mesh can be defined only once and shared by all these objects.
+
+    Meshes are compared in two steps: a cheap fingerprint (element counts and a few sampled
+    vertex positions) is computed for all objects before the export, and only meshes whose
+    fingerprint is not unique are hashed completely.
+    """
+    # How many vertex positions are part of the fingerprint
+    SAMPLE_COUNT = 16
+
+    def __init__(self, depsgraph):
+        # {mesh pointer: fingerprint}
+        self.fingerprints = {}
+        # {fingerprint: number of meshes with this fingerprint}
+        self.fingerprint_counts = {}
+        # {mesh pointer: full hash}
+        self.hashes = {}
+        # {(full hash, shape signature): mesh key of the first exported mesh with this geometry and shapes}
+        self.mesh_keys = {}
+        # (mesh pointer, shape signature) of the meshes that were replaced by an identical one
+        self.deduplicated = set()
+
+        for obj in depsgraph.objects:
+            if obj.type != "MESH":
+                continue
+            mesh = obj.data
+            pointer = mesh.as_pointer()
+            if pointer in self.fingerprints:
+                continue
+            fingerprint = self._get_fingerprint(mesh)
+            self.fingerprints[pointer] = fingerprint
+            self.fingerprint_counts[fingerprint] = self.fingerprint_counts.get(fingerprint, 0) + 1
+
+    def has_duplicates(self, obj):
+        """
+        Returns True if other objects might have the same geometry as this object.
+        Only these objects have to be exported as instances.
+        """
+        if obj.type != "MESH":
+            return False
+
+        mesh = obj.data
+        pointer = mesh.as_pointer()
+        try:
+            fingerprint = self.fingerprints[pointer]
+        except KeyError:
+            # Objects that are only created by instancing are not in depsgraph.objects
+            fingerprint = self._get_fingerprint(mesh)
+            self.fingerprints[pointer] = fingerprint
+            self.fingerprint_counts[fingerprint] = self.fingerprint_counts.get(fingerprint, 0) + 1
+        return self.fingerprint_counts[fingerprint] > 1
+
+    def get_mesh_key(self, obj, mesh_key, shape_signature):
+        """
+        Returns the key of the first mesh with the same geometry as the mesh of this object.
+        If there is none yet, the mesh of this object becomes the first one and mesh_key is returned.
+        shape_signature: The node trees of the object's materials (see object_cache.get_shape_signature()),
+        because the shapes they define (e.g. displacement) are shared along with the mesh.
+        """
+        mesh = obj.data
+        pointer = mesh.as_pointer()
+        try:
+            full_hash = self.hashes[pointer]
+        except KeyError:
+            # Objects are always instanced, so the transformation is not part of the hash
+            full_hash = GeometryCache.make_key(mesh, max(1, len(mesh.materials)), None)
+            self.hashes[pointer] = full_hash
+
+        key = (full_hash, shape_signature)
+        if key not in self.mesh_keys:
+            self.mesh_keys[key] = mesh_key
+        elif self.mesh_keys[key] != mesh_key:
+            self.deduplicated.add((pointer, shape_signature))
+        return self.mesh_keys[key]
+
+    @property
+    def deduplicated_count(self):
+        """ How many meshes could be replaced by an identical one """
+        return len(self.deduplicated)
+
+    @classmethod
+    def _get_fingerprint(cls, mesh):
+        vertices = mesh.vertices
+        vertex_count = len(vertices)
+        step = max(1, vertex_count // cls.SAMPLE_COUNT)
+        samples = tuple(tuple(vertices[i].co) for i in range(0, vertex_count, step))
+        return (vertex_count, len(mesh.edges), len(mesh.loops), len(mesh.polygons),
+                len(mesh.materials), len(mesh.uv_layers), len(mesh.vertex_colors), samples)
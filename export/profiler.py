@@ -0,0 +1,134 @@
+import os
+import json
+import tempfile
+
+SORT_KEYS = {
+    "TIME": lambda profile: profile.export_time,
+    "TRIANGLES": lambda profile: profile.triangle_count,
+    "STRANDS": lambda profile: profile.strand_count,
+    "MEMORY": lambda profile: profile.memory,
+}
+
+
+def get_default_filepath():
+    return os.path.join(tempfile.gettempdir(), "luxcore_export_profile.json")
+
+
+def estimate_mesh_memory(vertex_count, triangle_count, uv_layer_count, color_layer_count):
+    """ Rough estimate (in bytes) of the data LuxCore stores for a mesh, without acceleration structures """
+    # Position and normal (3 floats each), UV (2 floats) and color (3 floats) per vertex, 3 indices per triangle
+    bytes_per_vertex = 24 + 8 * uv_layer_count + 12 * color_layer_count
+    return vertex_count * bytes_per_vertex + triangle_count * 12
+
+
+def estimate_hair_memory(point_count, has_colors, has_uvs):
+    """ Rough estimate (in bytes) of the strand data passed to LuxCore, before it is tessellated """
+    # Position (3 floats) and thickness (1 float) per point
+    bytes_per_point = 16 + 12 * has_colors + 8 * has_uvs
+    return point_count * bytes_per_point
+
+
+class ObjectProfile:
+    def __init__(self, name):
+        self.name = name
+        # In seconds, without the export time of the materials of the object
+        self.export_time = 0
+        self.triangle_count = 0
+        self.strand_count = 0
+        # Estimate in bytes
+        self.memory = 0
+        # How often the object was converted (e.g. once per instancer in final render)
+        self.conversion_count = 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "export_time": self.export_time,
+            "triangles": self.triangle_count,
+            "strands": self.strand_count,
+            "memory_estimate": self.memory,
+            "conversions": self.conversion_count,
+        }
+
+
+class MaterialProfile:
+    def __init__(self, name):
+        self.name = name
+        # In seconds
+        self.export_time = 0
+        self.conversion_count = 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "export_time": self.export_time,
+            "conversions": self.conversion_count,
+        }
+
+
+class ExportProfiler:
+    """
+    Records how long the export of each object and material takes and how much geometry
+    each object creates, so the heaviest parts of a scene can be found.
+    Objects are identified by name, so all instances of an object are added up.
+    Material export times are only counted for the materials, not for the objects using them.
+    """
+
+    def __init__(self):
+        # {object name: ObjectProfile}
+        self.objects = {}
+        # {material name: MaterialProfile}
+        self.materials = {}
+        # Total export time of all materials, in seconds
+        self.material_time = 0
+
+    def _get_object(self, name):
+        try:
+            return self.objects[name]
+        except KeyError:
+            profile = ObjectProfile(name)
+            self.objects[name] = profile
+            return profile
+
+    def add_object(self, name, export_time):
+        profile = self._get_object(name)
+        profile.export_time += export_time
+        profile.conversion_count += 1
+
+    def add_mesh(self, name, triangle_count, memory):
+        profile = self._get_object(name)
+        profile.triangle_count += triangle_count
+        profile.memory += memory
+
+    def add_hair(self, name, strand_count, memory):
+        profile = self._get_object(name)
+        profile.strand_count += strand_count
+        profile.memory += memory
+
+    def add_material(self, name, export_time):
+        try:
+            profile = self.materials[name]
+        except KeyError:
+            profile = MaterialProfile(name)
+            self.materials[name] = profile
+        profile.export_time += export_time
+        profile.conversion_count += 1
+        self.material_time += export_time
+
+    def get_heaviest_objects(self, sort_by="TIME", count=None):
+        profiles = sorted(self.objects.values(), key=SORT_KEYS[sort_by], reverse=True)
+        return profiles[:count] if count else profiles
+
+    def get_slowest_materials(self, count=None):
+        profiles = sorted(self.materials.values(), key=lambda profile: profile.export_time, reverse=True)
+        return profiles[:count] if count else profiles
+
+    def to_dict(self):
+        return {
+            "objects": [profile.to_dict() for profile in self.get_heaviest_objects()],
+            "materials": [profile.to_dict() for profile in self.get_slowest_materials()],
+        }
+
+    def save(self, filepath):
+        with open(filepath, "w") as json_file:
+            json.dump(self.to_dict(), json_file, indent=2)
@@ -1,7 +1,19 @@
 import bpy
+import os
+import numpy as np
 from time import time
 from .. import utils
-import array
+from ..utils import openvdb_index
+
+# Names of the grids in the OpenVDB cache files written by Mantaflow, by channel
+MANTAFLOW_GRID_NAMES = {
+    "density": ("density",),
+    "flame": ("flame",),
+    "heat": ("heat",),
+    "velocity": ("velocity", "vel"),
+}
+# Channels that are stored in the noise cache files if the noise upres is enabled
+MANTAFLOW_NOISE_CHANNELS = {"density", "flame"}
 
 
 def convert(smoke_obj, channel, depsgraph):
@@ -36,9 +48,16 @@ def convert(smoke_obj, channel, depsgraph):
         raise Exception(msg)
 
     # We have to convert Blender's bpy_prop_array because it doesn't support the Python buffer interface.
-    # We use an array instead of a list here to save a lot of memory (list would use doubles instead of floats).
-    channeldata = array.array("f", grid)
+    # The float32 array can be passed to LuxCore's Property.AddAllFloat() without further copies.
+    channeldata = _grid_to_array(grid)
+
+    resolution = get_resolution(settings, channel)
+    print("conversion to array took %.3f s" % (time() - start))
 
+    return resolution, channeldata
+
+
+def get_resolution(settings, channel):
     # The smoke resolution along the x, y, z axis
     resolution = list(settings.domain_resolution)
 
@@ -49,7 +68,76 @@ def convert(smoke_obj, channel, depsgraph):
     else:
         if settings.use_noise:
             resolution = [res * settings.noise_scale for res in resolution]
+    return resolution
 
-    print("conversion to array took %.3f s" % (time() - start))
 
-    return resolution, channeldata
+def find_openvdb_cache(smoke_obj, channel, depsgraph):
+    """
+    Look for the grid of a channel in the OpenVDB cache file that Mantaflow wrote for the current frame,
+    so LuxCore can read it directly instead of copying it through Python with convert().
+    Returns a tuple (filepath, grid_name, bbox, resolution), or None if there is no usable cache file.
+    bbox is the index space bounding box (min x, y, z, max x, y, z) of the grid data in the file,
+    resolution is the resolution of the whole domain grid the bbox refers to.
+    """
+    if bpy.app.version[:2] < (2, 82):
+        # Old smoke simulations don't use Mantaflow
+        return None
+
+    grid_names = MANTAFLOW_GRID_NAMES.get(channel)
+    smoke_domain_mod = utils.find_smoke_domain_modifier(smoke_obj)
+    if not grid_names or smoke_domain_mod is None:
+        return None
+
+    settings = smoke_domain_mod.domain_settings
+    if settings.cache_data_format != "OPENVDB" or settings.use_adaptive_domain:
+        # With an adaptive domain, the grids in the file don't cover the domain object
+        return None
+
+    frame = depsgraph.scene_eval.frame_current
+    cache_dir = utils.get_abspath(settings.cache_directory, library=smoke_obj.original.library)
+    resolution = list(settings.domain_resolution)
+
+    if settings.use_noise and channel in MANTAFLOW_NOISE_CHANNELS:
+        filepath_template = os.path.join(cache_dir, "noise", "fluid_noise_%04d.vdb")
+        resolution = [res * settings.noise_scale for res in resolution]
+    else:
+        filepath_template = os.path.join(cache_dir, "data", "fluid_data_%04d.vdb")
+
+    filepath = filepath_template % frame
+    if not os.path.isfile(filepath):
+        return None
+
+    try:
+        available_names = openvdb_index.get_grid_names(filepath)
+        grid_name = next((name for name in grid_names if name in available_names), None)
+        if grid_name is None:
+            return None
+        creator, bbox, bbox_world, transform, gridtype, metadata = openvdb_index.get_grid_info(filepath, grid_name)
+    except RuntimeError as error:
+        print("Could not read OpenVDB cache file %s: %s" % (filepath, error))
+        return None
+
+    # Scalar channels need a float grid, velocity a vector grid
+    if (gridtype == "float") != (channel != "velocity"):
+        return None
+
+    # The grid data has to lie inside the domain
+    for i in range(3):
+        if bbox[i] < 0 or bbox[i + 3] > resolution[i] or bbox[i + 3] <= bbox[i]:
+            return None
+
+    if depsgraph.mode == "RENDER":
+        # Likely needed next in an animation render
+        openvdb_index.prefetch_grid_info(filepath_template % (frame + 1), [grid_name])
+
+    return filepath, grid_name, list(bbox), resolution
+
+
+def _grid_to_array(grid):
+    if hasattr(grid, "foreach_get"):
+        # Copies the whole grid in one call (only available in newer Blender versions)
+        channeldata = np.empty(len(grid), dtype=np.float32)
+        grid.foreach_get(channeldata)
+        return channeldata
+    # Element by element, but without creating a temporary list of Python floats
+    return np.fromiter(grid, dtype=np.float32, count=len(grid))
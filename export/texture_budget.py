@@ -0,0 +1,243 @@
+import os
+import imbuf
+import heapq
+import hashlib
+import tempfile
+from bpy_extras.object_utils import world_to_camera_view
+from mathutils import Vector
+from ..bin import pyluxcore
+from .. import utils
+from ..utils.disk_cache import DiskCache
+from . import image_storage
+from .image import ImageExporter
+
+# Increase this number if the way images are downscaled changes, so old cache entries are not used anymore
+CACHE_VERSION = 1
+# Textures are not downscaled below this width/height
+MIN_SIZE = 256
+# Added to the coverage, so textures of invisible objects are not infinitely more important to downscale
+MIN_COVERAGE = 0.05
+
+
+def get_default_directory():
+    return os.path.join(tempfile.gettempdir(), "luxcore_texture_cache")
+
+
+class TextureBudget:
+    """
+    Keeps the estimated memory of all imagemaps below a budget by replacing the largest
+    textures with downscaled copies. Textures that cover only a small part of the
+    camera view are downscaled first.
+    The downscaled copies are stored on disk, so they are only created once.
+    Images are scaled with the imbuf module, so no image datablocks are created during the render.
+    """
+
+    def __init__(self, settings, is_viewport_render):
+        max_memory = settings.viewport_max_memory if is_viewport_render else settings.max_memory
+        # In bytes
+        self.max_memory = max_memory * 1024 * 1024
+
+        if settings.directory:
+            dirpath = utils.get_abspath(settings.directory)
+        else:
+            dirpath = get_default_directory()
+        self.disk_cache = DiskCache(dirpath, settings.max_size * 1024 * 1024)
+        # {filepath: _Texture}
+        self.textures = {}
+        # Keys of the cache entries used by this export, they must not be deleted before LuxCore loads them
+        self.used_keys = set()
+
+    def add(self, luxcore_name, definitions, info, node_tree, image):
+        """ Register an imagemap texture, called during the export of imagemap nodes """
+        memory = image_storage.estimate_memory(info, definitions.get("storage"), definitions["channel"])
+        if memory == 0:
+            # Resolution unknown
+            return
+
+        filepath = definitions["file"]
+        try:
+            texture = self.textures[filepath]
+        except KeyError:
+            texture = _Texture(filepath, info, _get_source_key(image, filepath))
+            self.textures[filepath] = texture
+
+        # LuxCore loads the image once for each combination of storage and channel
+        texture.memory_variants[(definitions.get("storage"), definitions["channel"])] = memory
+        texture.luxcore_names.add(luxcore_name)
+        texture.node_trees.add(node_tree.name)
+
+    def apply(self, props, depsgraph):
+        """
+        Replace the files of the textures in props with downscaled copies if the budget is exceeded.
+        Returns the number of replaced textures.
+        """
+        total_memory = sum(texture.memory for texture in self.textures.values())
+        if total_memory <= self.max_memory:
+            return 0
+
+        coverage = _get_coverage(depsgraph)
+        for texture in self.textures.values():
+            texture.scale = 1
+            texture.coverage = sum(coverage.get(name, 1) for name in texture.node_trees)
+
+        # Priority queue, the texture with the highest priority is downscaled next
+        queue = [(-texture.get_priority(), texture.filepath) for texture in self.textures.values()]
+        heapq.heapify(queue)
+
+        while total_memory > self.max_memory and queue:
+            _, filepath = heapq.heappop(queue)
+            texture = self.textures[filepath]
+
+            memory = texture.memory
+            texture.scale *= 2
+            total_memory -= memory - texture.memory
+
+            if min(texture.get_size()) // 2 >= MIN_SIZE:
+                heapq.heappush(queue, (-texture.get_priority(), filepath))
+
+        if total_memory > self.max_memory:
+            print("[Texture Budget] Could not reduce texture memory to %d MiB (estimate: %d MiB)"
+                  % (self.max_memory / (1024 * 1024), total_memory / (1024 * 1024)))
+
+        replaced_count = 0
+        for texture in self.textures.values():
+            if texture.scale == 1:
+                continue
+
+            width, height = texture.get_size()
+            try:
+                downscaled_filepath = self._get_downscaled(texture, width, height)
+            except (OSError, RuntimeError, ValueError) as error:
+                print('[Texture Budget] Could not downscale "%s": %s' % (texture.filepath, error))
+                continue
+
+            for luxcore_name in texture.luxcore_names:
+                prop_name = "scene.textures." + luxcore_name + ".file"
+                if props.IsDefined(prop_name):
+                    props.Set(pyluxcore.Property(prop_name, downscaled_filepath))
+                    replaced_count += 1
+
+        self.disk_cache.enforce_size_limit(keep=self.used_keys)
+        return replaced_count
+
+    def _get_downscaled(self, texture, width, height):
+        filepath = texture.filepath
+        source_key = texture.source_key
+        if source_key is None:
+            source_key = ("content", _hash_file(filepath))
+
+        hasher = hashlib.md5()
+        hasher.update(repr((CACHE_VERSION, source_key, width, height)).encode())
+        key = hasher.hexdigest()
+
+        _, extension = os.path.splitext(filepath)
+        filename = "image" + extension
+
+        self.used_keys.add(key)
+        dirpath = self.disk_cache.get(key)
+        if dirpath:
+            return os.path.join(dirpath, filename)
+
+        print('[Texture Budget] Downscaling "%s" to %dx%d' % (filepath, width, height))
+        with self.disk_cache.new_entry(key) as temp_dirpath:
+            image = imbuf.load(filepath)
+            try:
+                image.resize((width, height), method="BILINEAR")
+                # Written in the file format of the original image
+                imbuf.write(image, filepath=os.path.join(temp_dirpath, filename))
+            finally:
+                image.free()
+        return os.path.join(self.disk_cache.dirpath, key, filename)
+
+
+class _Texture:
+    def __init__(self, filepath, info, source_key):
+        self.filepath = filepath
+        # Identifies the content of the file across sessions, None if the file has to be hashed
+        self.source_key = source_key
+        self.width = info.width
+        self.height = info.height
+        # {(storage, channel): estimated memory at full resolution}
+        self.memory_variants = {}
+        self.luxcore_names = set()
+        self.node_trees = set()
+        # Fraction of the camera view covered by objects using the texture
+        self.coverage = 1
+        # Width and height are divided by this number
+        self.scale = 1
+
+    @property
+    def memory(self):
+        return sum(self.memory_variants.values()) // (self.scale * self.scale)
+
+    def get_size(self):
+        return max(1, self.width // self.scale), max(1, self.height // self.scale)
+
+    def get_priority(self):
+        return self.memory / (self.coverage + MIN_COVERAGE)
+
+
+def _get_source_key(image, filepath):
+    if image.packed_file and not image.is_dirty:
+        # Extracted to a new temporary file in each session (unless the image cache is used),
+        # so the packed data identifies the image
+        return "packed", ImageExporter.get_packed_file_hash(image)
+    if image.source == "GENERATED" or (image.packed_file and image.is_dirty):
+        # Saved to a new temporary file in each session, the file content is only hashed if it is downscaled
+        return None
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        # Reported when the texture is downscaled
+        return None
+    return "file", filepath, stat.st_mtime_ns, stat.st_size
+
+
+def _hash_file(filepath):
+    hasher = hashlib.md5()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _get_coverage(depsgraph):
+    """
+    Estimate which fraction of the camera view is covered by the objects using each node tree,
+    based on the bounding boxes of the objects.
+    Returns a dict {node tree name: coverage}. Empty if the scene has no camera.
+    """
+    scene = depsgraph.scene_eval
+    camera = scene.camera
+    coverage = {}
+    if not utils.is_valid_camera(camera):
+        return coverage
+
+    for obj in depsgraph.objects:
+        if not obj.material_slots:
+            continue
+
+        area = _get_screen_area(scene, camera, obj)
+        for slot in obj.material_slots:
+            mat = slot.material
+            if mat and mat.luxcore.node_tree:
+                name = mat.luxcore.node_tree.name
+                coverage[name] = coverage.get(name, 0) + area
+    return coverage
+
+
+def _get_screen_area(scene, camera, obj):
+    """ Area of the projected bounding box of the object, relative to the camera view """
+    x_coords = []
+    y_coords = []
+
+    for corner in obj.bound_box:
+        co = world_to_camera_view(scene, camera, obj.matrix_world @ Vector(corner))
+        if co.z > 0:
+            x_coords.append(utils.clamp(co.x, 0, 1))
+            y_coords.append(utils.clamp(co.y, 0, 1))
+
+    if not x_coords:
+        # Behind the camera
+        return 0
+    return (max(x_coords) - min(x_coords)) * (max(y_coords) - min(y_coords))
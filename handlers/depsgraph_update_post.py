@@ -1,8 +1,15 @@
 import bpy
 from bpy.app.handlers import persistent
+from ..properties.imagepipeline import LuxCoreImagepipeline
 
 @persistent
-def handler(scene):
+def handler(scene, depsgraph=None):
+    # Some settings used by the imagepipeline are not ours and have no update callback
+    # (e.g. the exposure of Blender's color management, or the active camera).
+    # Older Blender versions don't pass the depsgraph, then we can't tell what was updated.
+    if depsgraph is None or depsgraph.id_type_updated("SCENE") or depsgraph.id_type_updated("CAMERA"):
+        LuxCoreImagepipeline.changed = True
+
     # If material name was changed, rename the node tree, too.
     for mat in bpy.data.materials:
         node_tree = mat.luxcore.node_tree
@@ -2,6 +2,7 @@ import bpy
 from bpy.app.handlers import persistent
 from ..utils import node as utils_node
 from ..utils import openVDB_sequence_resolve_all
+from ..utils import image_sequence_index
 from ..utils import clamp
 
 RELEVANT_NODES = {"LuxCoreNodeTexImagemap", "LuxCoreNodeTexOpenVDB", "LuxCoreNodeTexTimeInfo"}
@@ -20,6 +21,10 @@ def handler(scene):
     if not have_to_check_node_trees or scene.render.engine != "LUXCORE":
         return
 
+    # The files of image sequences might have changed since the last frame,
+    # each sequence directory is checked once when it is used next
+    image_sequence_index.revalidate()
+
     found_relevant_node = False
     for mat in bpy.data.materials:
         if not mat.luxcore.node_tree:
@@ -4,8 +4,10 @@ import bpy
 from bpy.app.handlers import persistent
 from ..bin import pyluxcore
 from .. import utils
-from ..utils import compatibility
+from ..utils import compatibility, openvdb_index
 from . import frame_change_pre
+from ..export.hair_cache import HairCache
+from ..export.image import ImageExporter
 from ..utils.errorlog import LuxCoreErrorLog
 from ..operators.manual_compatibility import LUXCORE_OT_convert_to_v23
 
@@ -91,6 +93,9 @@ def handler(_):
 
     frame_change_pre.have_to_check_node_trees = False
     LuxCoreErrorLog.clear()
+    openvdb_index.clear()
+    HairCache.clear()
+    ImageExporter.packed_file_hashes.clear()
 
     # After loading a .blend file, make it possible to execute the conversion operator again
     LUXCORE_OT_convert_to_v23.was_executed = False
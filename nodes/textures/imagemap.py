@@ -5,6 +5,7 @@ from bpy.props import (
 )
 from ..base import LuxCoreNodeTexture
 from ...export.image import ImageExporter
+from ...export import image_storage
 from ...properties.image_user import LuxCoreImageUser
 from ... import utils
 from ...utils import node as utils_node
@@ -18,6 +19,10 @@ NORMAL_MAP_DESC = (
     "normal maps) are supported. Gamma and brightness will be set to 1"
 )
 NORMAL_SCALE_DESC = "Height multiplier, used to adjust the baked-in height of the normal map"
+STORAGE_DESC = (
+    "How the image is stored in memory during the render. Lower precision needs less memory, "
+    "but high dynamic range images might lose detail in half precision"
+)
 
 
 class LuxCoreNodeTexImagemap(bpy.types.Node, LuxCoreNodeTexture):
@@ -91,6 +96,16 @@ class LuxCoreNodeTexImagemap(bpy.types.Node, LuxCoreNodeTexture):
                                          description="Normal Map Orientation",
                                          items=normal_map_orientation_items, default="opengl")
 
+    storage_items = [
+        ("scene", "Scene Default", "Use the imagemap storage set in the render settings (Textures panel)", 0),
+        ("auto", "Auto", "Use byte precision for 8 bit images and keep the precision of all other images", 1),
+        ("byte", "Byte", "8 bit integer per channel", 2),
+        ("half", "Half", "16 bit float per channel", 3),
+        ("float", "Float", "32 bit float per channel", 4),
+    ]
+    storage: EnumProperty(update=utils_node.force_viewport_update, name="Storage", items=storage_items,
+                          default="scene", description=STORAGE_DESC)
+
     show_thumbnail: BoolProperty(name="", default=True, description="Show thumbnail")
     
     projection_items = [
@@ -140,6 +155,7 @@ class LuxCoreNodeTexImagemap(bpy.types.Node, LuxCoreNodeTexture):
 
         col.prop(self, "projection", text="")
         col.prop(self, "wrap", text="")
+        col.prop(self, "storage", text="")
             
         if self.image:
             col.prop(self.image, "source", text="")
@@ -194,7 +210,20 @@ class LuxCoreNodeTexImagemap(bpy.types.Node, LuxCoreNodeTexture):
                 "gain": self.brightness,
             })
 
+        storage = self.storage
+        if storage == "scene":
+            storage = exporter.scene.luxcore.config.imagemap_storage
+
+        info = None
+        if storage != "default" or exporter.texture_budget:
+            info = image_storage.get_image_info(self.image, filepath)
+        if storage != "default":
+            self._set_storage(exporter, definitions, output_socket, storage, info)
+
         luxcore_name = self.create_props(props, definitions, luxcore_name)
+
+        if exporter.texture_budget:
+            exporter.texture_budget.add(luxcore_name, definitions, info, self.id_data, self.image)
         
         if self.projection == "box":
             tex_name = luxcore_name + "_triplanar"
@@ -221,3 +250,21 @@ class LuxCoreNodeTexImagemap(bpy.types.Node, LuxCoreNodeTexture):
             luxcore_name = tex_name
         
         return luxcore_name
+
+    def _set_storage(self, exporter, definitions, output_socket, storage, info):
+        filepath = definitions["file"]
+        channel = definitions["channel"]
+
+        if storage == "auto":
+            is_color_output = not self.is_normal_map and output_socket != self.outputs["Alpha"]
+            storage, channel = image_storage.select_storage(info, channel, is_color_output)
+            definitions["channel"] = channel
+
+        if storage:
+            definitions["storage"] = storage
+
+        # Images with the same settings are only loaded once by LuxCore
+        key = (filepath, storage, channel)
+        if exporter.stats and key not in exporter.imagemap_storage_cache:
+            exporter.imagemap_storage_cache.add(key)
+            exporter.stats.texture_memory_saved.value += image_storage.estimate_saved_memory(info, storage, channel)
@@ -9,6 +9,7 @@ from ...bin import pyluxcore
 
 from ...ui import icons
 from ...utils.errorlog import LuxCoreErrorLog
+from ...utils import openvdb_index
 from ...handlers import frame_change_pre
 
 
@@ -289,6 +290,8 @@ class LuxCoreNodeTexOpenVDB(bpy.types.Node, LuxCoreNodeTexture):
 
         #Get correct data file according to current frame
         file_path = self.file_path
+        # The file of the next frame, its metadata is prefetched during animation renders
+        next_file_path = file_path
         if self.use_internal_cachefiles:
             if smoke_domain_mod:
                 settings = smoke_domain_mod.domain_settings
@@ -296,12 +299,14 @@ class LuxCoreNodeTexOpenVDB(bpy.types.Node, LuxCoreNodeTexture):
                 frame_end = settings.point_cache.frame_end
 
                 file_path = self.get_cachefile_name(domain_eval, utils.clamp(frame, frame_start, frame_end), 0)
+                next_file_path = self.get_cachefile_name(domain_eval, utils.clamp(frame + 1, frame_start, frame_end), 0)
                 if frame_end > frame_start:
                     frame_change_pre.have_to_check_node_trees = True
         else:
-            indexed_filepaths = utils.openVDB_sequence_resolve_all(self.file_path)
+            indexed_filepaths = openvdb_index.resolve_sequence(self.file_path)
             if len(indexed_filepaths) > 1:
                 index, file_path = indexed_filepaths[utils.clamp(frame, self.first_frame, self.last_frame)-1]
+                index, next_file_path = indexed_filepaths[utils.clamp(frame + 1, self.first_frame, self.last_frame)-1]
                 if self.last_frame > self.first_frame:
                     frame_change_pre.have_to_check_node_trees = True
 
@@ -335,7 +340,10 @@ class LuxCoreNodeTexOpenVDB(bpy.types.Node, LuxCoreNodeTexture):
             grid_name = grid_name + "_low"
 
         # Get grid information from OpenVDB file, i.e. grid bounding box and type
-        creator, bbox, bBox_world, trans_matrix, gridtype, metadata = pyluxcore.GetOpenVDBGridInfo(bpy.path.abspath(file_path), grid_name)
+        creator, bbox, bBox_world, trans_matrix, gridtype, metadata = openvdb_index.get_grid_info(bpy.path.abspath(file_path), grid_name)
+
+        if depsgraph.mode == "RENDER" and next_file_path != file_path:
+            openvdb_index.prefetch_grid_info(bpy.path.abspath(next_file_path), [grid_name])
 
         ovdb_transform = mathutils.Matrix(
             (trans_matrix[0:4], trans_matrix[4:8], trans_matrix[8:12], trans_matrix[12:16])).transposed()
@@ -97,10 +97,9 @@ class LuxCoreNodeTexSmoke(bpy.types.Node, LuxCoreNodeTexture):
         tex_rot2 = mathutils.Matrix.Rotation(rotate[2], 4, 'Z')
         tex_rot = tex_rot2 @ tex_rot1 @ tex_rot0
 
-        resolution, grid = smoke.convert(domain_eval, output_socket.name, depsgraph)
-        nx, ny, nz = resolution
-
         smoke_domain_mod = utils.find_smoke_domain_modifier(domain_eval)
+        if smoke_domain_mod is None:
+            raise Exception('Object "%s" is not a smoke domain' % self.domain.name)
         grid_name = output_socket.name
         cell_size = mathutils.Vector((0, 0, 0))
         amplify = 1
@@ -118,8 +117,24 @@ class LuxCoreNodeTexSmoke(bpy.types.Node, LuxCoreNodeTexture):
 
         # combine transformations
         mapping_type = 'globalmapping3d'
-        matrix_transformation = utils.matrix_to_list(mathutils.Matrix.Translation(0.5*mathutils.Vector(cell_size)) @ tex_loc @ tex_rot @ tex_sca,
-                                                     invert=True)
+        domain_transformation = mathutils.Matrix.Translation(0.5*mathutils.Vector(cell_size)) @ tex_loc @ tex_rot @ tex_sca
+
+        # If Mantaflow already wrote the grid to disk, LuxCore can read it from there without any Python involvement
+        openvdb_cache = smoke.find_openvdb_cache(domain_eval, grid_name, depsgraph)
+
+        if openvdb_cache:
+            file_path, openvdb_grid_name, bbox, resolution = openvdb_cache
+            nx, ny, nz = [bbox[i + 3] - bbox[i] for i in range(3)]
+
+            # The file only contains the part of the domain with data, map it into the domain
+            bbox_offset = mathutils.Matrix.Translation([bbox[i] / resolution[i] for i in range(3)])
+            bbox_scale = mathutils.Matrix.Diagonal((nx / resolution[0], ny / resolution[1], nz / resolution[2], 1))
+            domain_transformation = domain_transformation @ bbox_offset @ bbox_scale
+        else:
+            resolution, grid = smoke.convert(domain_eval, grid_name, depsgraph)
+            nx, ny, nz = resolution
+
+        matrix_transformation = utils.matrix_to_list(domain_transformation, invert=True)
 
         definitions = {
             "type": "densitygrid",
@@ -133,6 +148,15 @@ class LuxCoreNodeTexSmoke(bpy.types.Node, LuxCoreNodeTexture):
             "mapping.transformation": matrix_transformation,
         }
 
+        if openvdb_cache:
+            definitions["openvdb.file"] = file_path
+            definitions["openvdb.grid"] = openvdb_grid_name
+            luxcore_name = self.create_props(props, definitions, luxcore_name)
+
+            print("[Node Tree: %s][Smoke Domain: %s] Using grid %s from OpenVDB cache file %s"
+                  % (self.id_data.name, self.domain.name, openvdb_grid_name, file_path))
+            return luxcore_name
+
         luxcore_name = self.create_props(props, definitions, luxcore_name)
         prefix = self.prefix + luxcore_name + "."
         # We use a fast path (AddAllFloat method) here to transfer the grid data to the properties
@@ -150,13 +174,11 @@ class LuxCoreNodeTexSmoke(bpy.types.Node, LuxCoreNodeTexture):
             prop = pyluxcore.Property(prefix + "data", [])
             prop.AddAllFloat(grid)
 
-        # We have to free the memory manually because the grid can be VERY large
-        # and if we don't invoke the garbage collection, we use way more RAM than necessary
+        # The grid can be VERY large, free it before the property is copied into props.
+        # Numpy arrays are freed immediately, so a garbage collection is not needed.
         del grid
-        import gc
-        gc.collect()
-
         props.Set(prop)
+        del prop
 
         elapsed_time = time() - start_time
         print("[Node Tree: %s][Smoke Domain: %s] Smoke export of channel %s took %.3f s"
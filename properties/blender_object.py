@@ -17,12 +17,17 @@ DESC_EXCLUDE_FROM_RENDER = (
     "The object will be excluded from render. "
     "Useful if you need objects to render for other engines, but not for LuxCore"
 )
+DESC_NEVER_CULL = (
+    "Always export this object, even if frustum culling is enabled and the object is outside of the camera view. "
+    "Use it for objects that are visible in reflections or cast shadows or light into the view"
+)
 
 class LuxCoreObjectProps(PropertyGroup):
     visible_to_camera: BoolProperty(name="Visible to Camera", default=True, description=DESC_VISIBLE_TO_CAM)
     exclude_from_render: BoolProperty(name="Exclude from Render", default=False, description=DESC_EXCLUDE_FROM_RENDER)
     enable_motion_blur: BoolProperty(name="Motion Blur", default=True, description=DESC_MOTION_BLUR)
     id: IntProperty(name="Object ID", default=-1, min=-1, soft_max=32767, description=DESC_OBJECT_ID)
+    never_cull: BoolProperty(name="Never Cull", default=False, description=DESC_NEVER_CULL)
 
     @classmethod
     def register(cls):
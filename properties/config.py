@@ -158,6 +158,43 @@ ENVLIGHT_CACHE_DESC = (
     "automatic portals). Note that it might consume a lot of RAM"
 )
 
+GEOMETRY_CACHE_DESC = (
+    "Store converted meshes on disk and load them in later renders if they did not change, "
+    "instead of converting them again. Only used in final renders"
+)
+
+HAIR_CACHE_DESC = (
+    "Keep the strand data of hair systems in memory and reuse it in later frames and renders "
+    "if the hair did not change, instead of collecting it from Blender again. Only used in final renders"
+)
+
+IMAGEMAP_STORAGE_DESC = (
+    "How imagemaps are stored in memory during the render, unless overridden in the imagemap node. "
+    "Lower precision needs less memory, but high dynamic range images might lose detail in half precision"
+)
+
+TEXTURE_BUDGET_DESC = (
+    "Replace the largest imagemaps with downscaled copies if the estimated memory of all imagemaps "
+    "exceeds the budget. Textures covering only a small part of the camera view are downscaled first"
+)
+
+FRUSTUM_CULLING_DESC = (
+    "Skip objects and instances outside of the camera view during the export. Culled objects are also "
+    "missing in reflections, shadows and indirect light, use the Never Cull option of objects to keep them. "
+    "Only used in final renders"
+)
+
+IMAGE_CACHE_DESC = (
+    "Store packed images on disk, keyed by their content, and reuse the files in later renders "
+    "(even in other Blender sessions), instead of writing them to a new temporary file for each render. "
+    "Generated and modified images are not cached"
+)
+
+DEDUPLICATE_MESHES_DESC = (
+    "Define meshes with identical geometry only once, even if they use different mesh datablocks "
+    "(e.g. because an asset was appended several times). Only used in final renders"
+)
+
 # Used in enum callback
 film_opencl_device_items = []
 
@@ -351,6 +388,50 @@ class LuxCoreConfigEnvLightCache(PropertyGroup):
                                                 "If you want to use the saved cache, disable this option")
 
 
+class LuxCoreConfigGeometryCache(PropertyGroup):
+    enabled: BoolProperty(name="Enabled", default=False, description=GEOMETRY_CACHE_DESC)
+    directory: StringProperty(name="Directory", subtype="DIR_PATH",
+                              description="Where the cached meshes are stored. "
+                                          "If empty, a directory in the system's temp folder is used")
+    max_size: IntProperty(name="Max. Size (MiB)", default=4096, min=1,
+                          description="If the cache grows larger, the least recently used meshes are deleted")
+
+
+class LuxCoreConfigHairCache(PropertyGroup):
+    enabled: BoolProperty(name="Enabled", default=False, description=HAIR_CACHE_DESC)
+    max_size: IntProperty(name="Max. Size (MiB)", default=2048, min=1,
+                          description="If the cache grows larger, the least recently used hair systems are removed")
+
+
+class LuxCoreConfigImageCache(PropertyGroup):
+    enabled: BoolProperty(name="Enabled", default=False, description=IMAGE_CACHE_DESC)
+    directory: StringProperty(name="Directory", subtype="DIR_PATH",
+                              description="Where the extracted images are stored. "
+                                          "If empty, a directory in the system's temp folder is used")
+    max_size: IntProperty(name="Max. Size (MiB)", default=8192, min=1,
+                          description="If the cache grows larger, the least recently used images are deleted")
+
+
+class LuxCoreConfigTextureBudget(PropertyGroup):
+    enabled: BoolProperty(name="Enabled", default=False, description=TEXTURE_BUDGET_DESC)
+    max_memory: IntProperty(name="Budget (MiB)", default=8192, min=1,
+                            description="Maximum estimated memory of all imagemaps in final renders")
+    viewport_max_memory: IntProperty(name="Viewport Budget (MiB)", default=2048, min=1,
+                                     description="Maximum estimated memory of all imagemaps in viewport renders")
+    directory: StringProperty(name="Directory", subtype="DIR_PATH",
+                              description="Where the downscaled textures are stored. "
+                                          "If empty, a directory in the system's temp folder is used")
+    max_size: IntProperty(name="Max. Cache Size (MiB)", default=4096, min=1,
+                          description="If the cache grows larger, the least recently used textures are deleted")
+
+
+class LuxCoreConfigFrustumCulling(PropertyGroup):
+    enabled: BoolProperty(name="Enabled", default=False, description=FRUSTUM_CULLING_DESC)
+    margin: FloatProperty(name="Margin", default=10, min=0, soft_max=100, subtype="PERCENTAGE",
+                          description="Enlarge the camera view by this amount in each direction before "
+                                      "testing which objects are outside")
+
+
 class LuxCoreConfigNoiseEstimation(PropertyGroup):
     warmup: IntProperty(name="Warmup Samples", default=8, min=1,
                          description=NOISE_THRESH_WARMUP_DESC)
@@ -489,6 +570,28 @@ class LuxCoreConfig(PropertyGroup):
     photongi: PointerProperty(type=LuxCoreConfigPhotonGI)
     # Special properties of the env. light cache (aka automatic portals)
     envlight_cache: PointerProperty(type=LuxCoreConfigEnvLightCache)
+    # Converted meshes stored on disk between renders
+    geometry_cache: PointerProperty(type=LuxCoreConfigGeometryCache)
+    # Collected hair strands kept in memory between renders
+    hair_cache: PointerProperty(type=LuxCoreConfigHairCache)
+    # Packed and generated images extracted to disk, kept between renders
+    image_cache: PointerProperty(type=LuxCoreConfigImageCache)
+    deduplicate_meshes: BoolProperty(name="Deduplicate Meshes", default=False, description=DEDUPLICATE_MESHES_DESC)
+
+    imagemap_storage_items = [
+        ("auto", "Auto", "Use byte precision for 8 bit images and keep the precision of all other images, "
+                         "drop the alpha channel if it is not used", 0),
+        ("default", "LuxCore Default", "Let LuxCore decide how to store the images", 1),
+        ("byte", "Byte", "8 bit integer per channel", 2),
+        ("half", "Half", "16 bit float per channel", 3),
+        ("float", "Float", "32 bit float per channel", 4),
+    ]
+    imagemap_storage: EnumProperty(name="Imagemap Storage", items=imagemap_storage_items, default="default",
+                                   description=IMAGEMAP_STORAGE_DESC)
+    # Downscaling of imagemaps if they need too much memory
+    texture_budget: PointerProperty(type=LuxCoreConfigTextureBudget)
+    # Skipping objects outside of the camera view
+    frustum_culling: PointerProperty(type=LuxCoreConfigFrustumCulling)
 
     # FILESAVER options
     use_filesaver: BoolProperty(name="Only write LuxCore scene", default=False)
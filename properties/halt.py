@@ -20,25 +20,33 @@ NOISE_THRESH_STEP_DESC = (
 )
 
 
+def update_halt(self, context):
+    # Tell the final render refresh loop that the halt conditions have to be updated
+    LuxCoreHaltConditions.changed = True
+
+
 # Attached to view layer and scene
 class LuxCoreHaltConditions(bpy.types.PropertyGroup):
-    enable: BoolProperty(name="Enable", default=False)
+    # Set by the update callbacks, reset by the final render refresh loop
+    changed = False
+
+    enable: BoolProperty(name="Enable", default=False, update=update_halt)
 
-    use_time: BoolProperty(name="Use Time", default=False)
-    time: IntProperty(name="Time (s)", default=600, min=1)
+    use_time: BoolProperty(name="Use Time", default=False, update=update_halt)
+    time: IntProperty(name="Time (s)", default=600, min=1, update=update_halt)
 
-    use_samples: BoolProperty(name="Use Samples", default=False)
-    samples: IntProperty(name="Samples", default=500, min=1)
+    use_samples: BoolProperty(name="Use Samples", default=False, update=update_halt)
+    samples: IntProperty(name="Samples", default=500, min=1, update=update_halt)
 
     # Noise threshold
     use_noise_thresh: BoolProperty(name="Use Noise Threshold", default=False,
-                                    description=USE_NOISE_THRESH_DESC)
+                                    description=USE_NOISE_THRESH_DESC, update=update_halt)
     noise_thresh: IntProperty(name="Noise Threshold", default=5, min=0, soft_min=3, max=255,
-                               description=NOISE_THRESH_DESC)
+                               description=NOISE_THRESH_DESC, update=update_halt)
     noise_thresh_warmup: IntProperty(name="Warmup Samples", default=64, min=1,
-                                      description=NOISE_THRESH_WARMUP_DESC)
+                                      description=NOISE_THRESH_WARMUP_DESC, update=update_halt)
     noise_thresh_step: IntProperty(name="Test Step Samples", default=64, min=1, soft_min=16,
-                                    description=NOISE_THRESH_STEP_DESC)
+                                    description=NOISE_THRESH_STEP_DESC, update=update_halt)
 
     def is_enabled(self):
         return self.enable and (self.use_time or self.use_samples or self.use_noise_thresh)
@@ -3,6 +3,7 @@ import bpy
 from bpy.types import PropertyGroup
 from bpy.props import IntProperty, BoolProperty, PointerProperty, EnumProperty
 from .. import utils
+from ..utils import image_sequence_index
 from ..ui import icons
 
 
@@ -65,7 +66,9 @@ class LuxCoreImageUser(PropertyGroup):
             # A new or different image was linked,
             # auto-detect sequence length and first frame offset
             if image.source == "SEQUENCE":
-                indexed_filepaths = utils.image_sequence_resolve_all(image)
+                # The user might have added files to the directory since the last export
+                image_sequence_index.revalidate()
+                indexed_filepaths = image_sequence_index.get_sequence(image)
 
                 if indexed_filepaths:
                     first_index, first_path = indexed_filepaths[0]
@@ -8,6 +8,11 @@ from .light import GAMMA_DESCRIPTION
 from .image_user import LuxCoreImageUser
 
 
+def update_imagepipeline(self, context):
+    # Tell the final render refresh loop that the imagepipeline has to be updated
+    LuxCoreImagepipeline.changed = True
+
+
 class LuxCoreImagepipelinePlugin:
     def is_enabled(self, context):
         using_viewport_denoiser = context and context.scene.luxcore.viewport.denoise
@@ -18,7 +23,7 @@ class LuxCoreImagepipelinePlugin:
 
 class LuxCoreImagepipelineTonemapper(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Tonemapper"
-    enabled: BoolProperty(name=NAME, default=True, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=True, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     FSTOP_DESC = "Camera aperture, lower values result in a brighter image"
@@ -39,27 +44,30 @@ class LuxCoreImagepipelineTonemapper(PropertyGroup, LuxCoreImagepipelinePlugin):
         ("TONEMAP_REINHARD02", "Reinhard", "Non-linear tonemapper that adapts to the image brightness", 2),
     ]
     type: EnumProperty(name="Tonemapper Type", items=type_items, default="TONEMAP_LINEAR",
-                        description="The tonemapper converts the image from HDR to LDR")
+                        description="The tonemapper converts the image from HDR to LDR", update=update_imagepipeline)
 
     # Settings for TONEMAP_LINEAR
     use_autolinear: BoolProperty(name="Auto Brightness", default=False,
-                                  description="Auto-detect the optimal image brightness")
+                                  description="Auto-detect the optimal image brightness", update=update_imagepipeline)
     linear_scale: FloatProperty(name="Gain", default=1.0, min=0, soft_min=0.00001, soft_max=100,
                                  precision=5,
-                                 description="Image brightness is multiplied with this value")
+                                 description="Image brightness is multiplied with this value",
+                                 update=update_imagepipeline)
 
     # Settings for TONEMAP_LUXLINEAR (camera settings)
-    fstop: FloatProperty(name="F-stop", default=2.8, min=0.01, description=FSTOP_DESC)
-    exposure: FloatProperty(name="Shutter (s)", default=1 / 100, min=0, description=EXPOSURE_DESC)
-    sensitivity: FloatProperty(name="ISO", default=100, min=0, soft_max=6400, description=SENSITIVITY_DESC)
+    fstop: FloatProperty(name="F-stop", default=2.8, min=0.01, description=FSTOP_DESC, update=update_imagepipeline)
+    exposure: FloatProperty(name="Shutter (s)", default=1 / 100, min=0, description=EXPOSURE_DESC,
+                            update=update_imagepipeline)
+    sensitivity: FloatProperty(name="ISO", default=100, min=0, soft_max=6400, description=SENSITIVITY_DESC,
+                               update=update_imagepipeline)
 
     # Settings for TONEMAP_REINHARD02
     reinhard_prescale: FloatProperty(name="Pre", default=1, min=0, max=25,
-                                      description=REINHARD_PRESCALE_DESC)
+                                      description=REINHARD_PRESCALE_DESC, update=update_imagepipeline)
     reinhard_postscale: FloatProperty(name="Post", default=1.2, min=0, max=25,
-                                       description=REINHARD_POSTSCALE_DESC)
+                                       description=REINHARD_POSTSCALE_DESC, update=update_imagepipeline)
     reinhard_burn: FloatProperty(name="Burn", default=6, min=0.01, max=25,
-                                  description=REINHARD_BURN_DESC)
+                                  description=REINHARD_BURN_DESC, update=update_imagepipeline)
 
     def is_automatic(self):
         if not self.enabled:
@@ -70,82 +78,89 @@ class LuxCoreImagepipelineTonemapper(PropertyGroup, LuxCoreImagepipelinePlugin):
 
 class LuxCoreImagepipelineBloom(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Bloom"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     radius: FloatProperty(name="Radius", default=7, min=0.1, max=100, precision=1, subtype="PERCENTAGE",
-                           description="Size of the bloom effect (percent of the image size)")
+                           description="Size of the bloom effect (percent of the image size)",
+                           update=update_imagepipeline)
     weight: FloatProperty(name="Strength", default=25, min=0, max=100, precision=1, subtype="PERCENTAGE",
-                           description="Strength of the bloom effect (a linear mix factor)")
+                           description="Strength of the bloom effect (a linear mix factor)",
+                           update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineMist(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Mist"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     EXCLUDE_BACKGROUND_DESC = "Disable mist over background parts of the image (where distance = infinity)"
 
-    color: FloatVectorProperty(name="Color", default=(0.3, 0.4, 0.55), min=0, max=1, subtype="COLOR")
+    color: FloatVectorProperty(name="Color", default=(0.3, 0.4, 0.55), min=0, max=1, subtype="COLOR",
+                               update=update_imagepipeline)
     amount: FloatProperty(name="Strength", default=30, min=0, max=100, precision=1, subtype="PERCENTAGE",
-                           description="Strength of the mist overlay")
+                           description="Strength of the mist overlay", update=update_imagepipeline)
     start_distance: FloatProperty(name="Start", default=100, min=0, subtype="DISTANCE",
-                                   description="Distance from the camera where the mist starts to be visible")
+                                   description="Distance from the camera where the mist starts to be visible",
+                                   update=update_imagepipeline)
     end_distance: FloatProperty(name="End", default=1000, min=0, subtype="DISTANCE",
-                                 description="Distance from the camera where the mist reaches full strength")
+                                 description="Distance from the camera where the mist reaches full strength",
+                                 update=update_imagepipeline)
     exclude_background: BoolProperty(name="Exclude Background", default=True,
-                                      description=EXCLUDE_BACKGROUND_DESC)
+                                      description=EXCLUDE_BACKGROUND_DESC, update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineVignetting(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Vignetting"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     scale: FloatProperty(name="Strength", default=40, min=0, soft_max=60, max=100, precision=1,
-                          subtype="PERCENTAGE", description="Strength of the vignette")
+                          subtype="PERCENTAGE", description="Strength of the vignette", update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineColorAberration(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Color Aberration"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = False
 
     amount: FloatProperty(name="Strength", default=0.5, min=0, soft_max=10, max=100, precision=1,
-                           subtype="PERCENTAGE", description="Strength of the color aberration effect")
+                           subtype="PERCENTAGE", description="Strength of the color aberration effect",
+                           update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineBackgroundImage(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Background Image"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     def update_image(self, context):
         self.image_user.update(self.image)
+        update_imagepipeline(self, context)
 
     image: PointerProperty(name="Image", type=Image, update=update_image)
     image_user: PointerProperty(type=LuxCoreImageUser)
-    gamma: FloatProperty(name="Gamma", default=2.2, min=0, description=GAMMA_DESCRIPTION)
+    gamma: FloatProperty(name="Gamma", default=2.2, min=0, description=GAMMA_DESCRIPTION, update=update_imagepipeline)
     storage_items = [
         ("byte", "Byte", "8 bit integer per channel. Use for normal LDR JPG/PNG images", 0),
         ("float", "Float", "32 bit float per channel. Higher precision, but also 4 times "
                            "the RAM usage. Use for 16 bit PNG or for HDR images like EXR", 1),
     ]
-    storage: EnumProperty(name="Storage", items=storage_items, default="byte")
+    storage: EnumProperty(name="Storage", items=storage_items, default="byte", update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineWhiteBalance(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "White Balance"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     temperature: FloatProperty(name="Temperature", default=6500, min=1000, max=10000,
-                          description="White point temperature")
+                          description="White point temperature", update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineCameraResponseFunc(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Analog Film Simulation"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     # TODO: Support CRF file as Blender text block (similar to IES files)
@@ -154,17 +169,17 @@ class LuxCoreImagepipelineCameraResponseFunc(PropertyGroup, LuxCoreImagepipeline
         ("FILE", "File", "Choose a camera response function file (.crf)", 2),
     ]
     type: EnumProperty(name="Type", items=type_items, default="PRESET",
-                        description="Source of the CRF data")
+                        description="Source of the CRF data", update=update_imagepipeline)
 
     file: StringProperty(name="CRF File", subtype="FILE_PATH",
-                         description="Path to the external .crf file")
+                         description="Path to the external .crf file", update=update_imagepipeline)
     # Internal, not shown to the user (set by operator "luxcore.select_crf")
-    preset: StringProperty(name="")
+    preset: StringProperty(name="", update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineColorLUT(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "LUT"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = True
 
     input_colorspace_items = [
@@ -173,19 +188,21 @@ class LuxCoreImagepipelineColorLUT(PropertyGroup, LuxCoreImagepipelinePlugin):
         ("SRGB_LINEAR", "sRGB Linear", "sRGB space without gamma correction", 1),
     ]
     input_colorspace: EnumProperty(name="Input Colorspace", items=input_colorspace_items, default="SRGB_GAMMA_CORRECTED",
-                                   description="Choose the color space that is expected by the LUT file")
+                                   description="Choose the color space that is expected by the LUT file",
+                                   update=update_imagepipeline)
 
     # TODO: Support file as Blender text block (similar to IES files)
     file: StringProperty(name="CUBE File", subtype="FILE_PATH",
-                         description="Path to the .cube file")
+                         description="Path to the .cube file", update=update_imagepipeline)
 
     strength: FloatProperty(name="Strength", default=100, min=0, max=100, precision=1, subtype="PERCENTAGE",
-                            description="Mix between input without LUT and result with LUT")
+                            description="Mix between input without LUT and result with LUT",
+                            update=update_imagepipeline)
 
 
 class LuxCoreImagepipelineContourLines(PropertyGroup, LuxCoreImagepipelinePlugin):
     NAME = "Irradiance Contour Lines"
-    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME)
+    enabled: BoolProperty(name=NAME, default=False, description="Enable/disable " + NAME, update=update_imagepipeline)
     compatible_with_viewport_denoising = False
 
     ZERO_GRID_SIZE_DESC = (
@@ -193,13 +210,14 @@ class LuxCoreImagepipelineContourLines(PropertyGroup, LuxCoreImagepipelinePlugin
         "(-1 => no grid, 0 => all black, >0 => size of the black grid)"
     )
 
-    scale: FloatProperty(name="Scale", default=179, min=0, soft_max=1000)
+    scale: FloatProperty(name="Scale", default=179, min=0, soft_max=1000, update=update_imagepipeline)
     contour_range: FloatProperty(name="Range", default=100, soft_max=1000,
-                                  description="Max range of irradiance values (unit: lux), minimum is always 0")
+                                  description="Max range of irradiance values (unit: lux), minimum is always 0",
+                                  update=update_imagepipeline)
     steps: IntProperty(name="Steps", default=8, min=0, soft_min=2, soft_max=50,
-                        description="Number of steps to draw in interval range")
+                        description="Number of steps to draw in interval range", update=update_imagepipeline)
     zero_grid_size: IntProperty(name="Grid Size", default=8, min=-1, soft_max=20,
-                                 description=ZERO_GRID_SIZE_DESC)
+                                 description=ZERO_GRID_SIZE_DESC, update=update_imagepipeline)
 
 
 class LuxCoreImagepipeline(PropertyGroup):
@@ -207,8 +225,12 @@ class LuxCoreImagepipeline(PropertyGroup):
     Used (and initialized) in properties/camera.py
     The UI elements are located in ui/camera.py
     """
+    # Set by the update callbacks of all imagepipeline settings (and by the light groups),
+    # reset by the final render refresh loop when it has updated the imagepipeline
+    changed = False
+
     transparent_film: BoolProperty(name="Transparent Film", default=False,
-                                    description="Make the world background transparent")
+                                    description="Make the world background transparent", update=update_imagepipeline)
 
     tonemapper: PointerProperty(type=LuxCoreImagepipelineTonemapper)
     bloom: PointerProperty(type=LuxCoreImagepipelineBloom)
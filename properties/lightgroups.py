@@ -5,6 +5,7 @@ from bpy.props import (
 )
 from bpy.types import PropertyGroup
 from ..utils import node as utils_node
+from .imagepipeline import LuxCoreImagepipeline
 
 # OpenCL engines support 8 lightgroups
 # However one group is always there (the default group), so 7 can be user-defined
@@ -14,6 +15,11 @@ RGB_GAIN_DESC = "The color of each light in this group is multiplied with this m
 TEMP_DESC = "Blackbody emission color in Kelvin by which to shift the color of each light in this group"
 
 
+def update_lightgroups(self, context):
+    # The light group gains are part of the imagepipeline
+    LuxCoreImagepipeline.changed = True
+
+
 class LuxCoreLightGroup(PropertyGroup):
     def name_set(self, value):
         old_name = self.get("name", "")
@@ -67,16 +73,18 @@ class LuxCoreLightGroup(PropertyGroup):
     name: StringProperty(name="Name", set=name_set, get=name_get)
     
     enabled: BoolProperty(default=True, description="Enable/disable this light group. "
-                                                     "If disabled, all lights in this group are off")
+                                                     "If disabled, all lights in this group are off",
+                                                     update=update_lightgroups)
     show_settings: BoolProperty(default=True)
-    gain: FloatProperty(name="Gain", default=1, min=0, description="Brightness multiplier")
-    use_rgb_gain: BoolProperty(name="Color:", default=True, description="Use RGB color multiplier")
+    gain: FloatProperty(name="Gain", default=1, min=0, description="Brightness multiplier", update=update_lightgroups)
+    use_rgb_gain: BoolProperty(name="Color:", default=True, description="Use RGB color multiplier",
+                               update=update_lightgroups)
     rgb_gain: FloatVectorProperty(name="", default=(1, 1, 1), min=0, max=1, subtype="COLOR",
-                                   description=RGB_GAIN_DESC)
+                                   description=RGB_GAIN_DESC, update=update_lightgroups)
     use_temperature: BoolProperty(name="Temperature:", default=False,
-                                   description="Use temperature multiplier")
+                                   description="Use temperature multiplier", update=update_lightgroups)
     temperature: FloatProperty(name="Kelvin", default=4000, min=1000, max=10000, precision=0,
-                                description=TEMP_DESC)
+                                description=TEMP_DESC, update=update_lightgroups)
 
 
 # Attached to scene
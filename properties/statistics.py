@@ -1,6 +1,6 @@
 import bpy
 from bpy.types import PropertyGroup
-from bpy.props import BoolProperty, EnumProperty
+from bpy.props import BoolProperty, EnumProperty, IntProperty, StringProperty
 from ..utils import ui as utils_ui
 
 
@@ -38,6 +38,10 @@ def triangle_count_to_string(triangle_count):
         return "{:,}".format(triangle_count)
 
 
+def memory_to_string(bytes_count):
+    return "%d MiB" % (bytes_count / (1024 * 1024))
+
+
 def path_depths_to_string(depths):
     if not depths:
         return ""
@@ -193,14 +197,22 @@ class LuxCoreRenderStats:
                                        0, smaller_is_better, time_to_string, get_rounded)
         self.export_time_hair = Stat("    Hair Export Time", categories[-1],
                                      0, smaller_is_better, time_to_string, get_rounded)
+        self.hair_cache_hits = Stat("    Hair Cache Hits", categories[-1], 0, greater_is_better)
+        self.hair_cache_misses = Stat("    Hair Cache Misses", categories[-1], 0, smaller_is_better)
         self.export_time_instancing = Stat("    Instancing Time", categories[-1],
                                            0, smaller_is_better, time_to_string, get_rounded)
+        self.geometry_cache_hits = Stat("    Meshes from Geometry Cache", categories[-1], 0, greater_is_better)
+        self.deduplicated_meshes = Stat("    Deduplicated Meshes", categories[-1], 0, greater_is_better)
         self.session_init_time = Stat("Session Init Time", categories[-1],
                                       0, smaller_is_better, time_to_string, get_rounded)
         categories.append("Scene")
         self.light_count = Stat("Lights", categories[-1], 0)
         self.triangle_count = Stat("Triangles", categories[-1], 0, string_func=triangle_count_to_string)
         self.vram = Stat("VRAM", categories[-1], (0, 0), vram_better, vram_usage_to_string)
+        self.texture_memory_saved = Stat("Texture Memory Saved", categories[-1],
+                                         0, greater_is_better, memory_to_string)
+        self.downscaled_textures = Stat("Downscaled Textures", categories[-1], 0, smaller_is_better)
+        self.culled_objects = Stat("Culled Objects", categories[-1], 0)
         categories.append("Settings")
         self.render_engine = Stat("Engine", categories[-1], "?")
         self.use_hybridbackforward = Stat("Add Light Tracing", categories[-1], False, string_func=bool_to_string)
@@ -214,11 +226,12 @@ class LuxCoreRenderStats:
         self.cache_envlight = Stat("Env. Light Cache", categories[-1], False, string_func=bool_to_string)
         self.cache_dls = Stat("DLS Cache", categories[-1], False, string_func=bool_to_string)
 
-        self.members = [getattr(self, attr) for attr in dir(self)
-                        if not callable(getattr(self, attr)) and not attr.startswith("__")]
+        self.members = [getattr(self, attr) for attr in dir(self) if isinstance(getattr(self, attr), Stat)]
         self.members.sort(key=lambda stat: stat.id)
 
         self.categories = categories
+        # The ExportProfiler of the last export (only available in final render)
+        self.export_profile = None
 
     def to_list(self):
         return self.members
@@ -226,6 +239,7 @@ class LuxCoreRenderStats:
     def reset(self):
         for stat in self.to_list():
             stat.reset()
+        self.export_profile = None
 
     def update_from_luxcore_stats(self, stat_props):
         self.render_time.value = stat_props.Get("stats.renderengine.time").GetFloat()
@@ -277,6 +291,21 @@ class LuxCoreRenderStatsCollection(PropertyGroup):
     second_slot: EnumProperty(name="Second Slot", description="The other slot to compare with",
                                items=second_slot_items_callback)
 
+    profile_sort_by_items = [
+        ("TIME", "Export Time", "Sort objects by the time it took to export them", 0),
+        ("TRIANGLES", "Triangles", "Sort objects by their triangle count", 1),
+        ("STRANDS", "Hair Strands", "Sort objects by their hair strand count", 2),
+        ("MEMORY", "Memory", "Sort objects by the estimated memory usage of their geometry in LuxCore", 3),
+    ]
+    profile_sort_by: EnumProperty(name="Sort By", items=profile_sort_by_items, default="TIME")
+    profile_count: IntProperty(name="Objects", default=10, min=1, soft_max=50,
+                               description="How many of the heaviest objects are shown")
+    save_export_profile: BoolProperty(name="Save as JSON", default=False,
+                                      description="Save the export profile of every final render to a JSON file")
+    export_profile_filepath: StringProperty(name="File", subtype="FILE_PATH",
+                                            description="Where the export profile is saved. "
+                                                        "If empty, a file in the system's temp folder is used")
+
     def __getitem__(self, slot_index):
         """
         Important: All access to self._slots needs to be through this method so we can add slots if necessary!
@@ -1,5 +1,5 @@
 import bpy
-from bpy.props import IntProperty, EnumProperty, BoolProperty
+from bpy.props import IntProperty, FloatProperty, EnumProperty, BoolProperty
 
 
 class LuxCoreViewportSettings(bpy.types.PropertyGroup):
@@ -23,6 +23,11 @@ class LuxCoreViewportSettings(bpy.types.PropertyGroup):
     mag_filter: EnumProperty(name="Filter", items=mag_filters, default="NEAREST",
                               description="Upscaling filter used when pixel size is larger than 1")
 
+    use_half_float: BoolProperty(name="Half Float Display", default=False,
+                                  description="Upload the viewport render to the GPU in half float precision, "
+                                              "which halves the bandwidth (useful for large viewports). "
+                                              "Very bright pixels might be clamped")
+
     reduce_resolution_on_edit: BoolProperty(name="Reduce first sample resolution", default=True,
                                              description="Render the first sample after editing the scene "
                                                          "with reduced resolution to provide a quicker response "
@@ -45,3 +50,21 @@ class LuxCoreViewportSettings(bpy.types.PropertyGroup):
     denoise: BoolProperty(name="Denoise", default=True,
                            description="Denoise the viewport render once the halt time is reached. "
                                        "Note that this disables most imagepipeline plugins in the viewport")
+    periodic_denoise: BoolProperty(name="Denoise While Rendering", default=False,
+                                    description="Periodically denoise the viewport render while it is still "
+                                                "rendering, instead of only once the halt time is reached")
+    denoise_cadences = [
+        ("SAMPLES", "Samples", "Denoise each time the specified number of samples was added", 0),
+        ("TIME", "Time", "Denoise each time the specified time has passed", 1),
+    ]
+    denoise_cadence: EnumProperty(name="Cadence", items=denoise_cadences, default="TIME",
+                                   description="When to run the denoiser while rendering")
+    denoise_interval_samples: IntProperty(name="Samples", default=16, min=1,
+                                           description="Number of new samples between two denoiser runs")
+    denoise_interval_time: FloatProperty(name="Interval (s)", default=1, min=0.1, soft_max=10,
+                                          description="Time between two denoiser runs")
+    denoise_max_time_share: FloatProperty(name="Max Denoiser Time", default=25, min=1, max=100,
+                                           precision=0, subtype="PERCENTAGE",
+                                           description="Maximum share of the wall time spent denoising. "
+                                                       "Denoiser runs are delayed if the last run took too long "
+                                                       "(rendering is paused while the denoiser runs)")
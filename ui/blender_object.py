@@ -30,6 +30,8 @@ class LUXCORE_OBJECT_PT_object(ObjectButtonsPanel, Panel):
         col.prop(obj.luxcore, "id")
         col.prop(obj.luxcore, "visible_to_camera")
         col.prop(obj.luxcore, "exclude_from_render")
+        if context.scene.luxcore.config.frustum_culling.enabled:
+            col.prop(obj.luxcore, "never_cull")
 
         # Motion blur settings
         cam = context.scene.camera
@@ -5,6 +5,7 @@ from ..engine.base import LuxCoreRenderEngine
 from . import icons
 from ..properties.denoiser import LuxCoreDenoiser
 from ..properties.display import LuxCoreDisplaySettings
+from ..properties.statistics import time_to_string, triangle_count_to_string
 
 
 class LuxCoreImagePanel:
@@ -186,3 +187,54 @@ class LUXCORE_IMAGE_PT_statistics(Panel, LuxCoreImagePanel):
             # col.prop(statistics_collection, "second_slot", text="")
             for stat, other_stat in comparison_stat_list:
                 col.label(text=str(other_stat), icon=self.icon(other_stat, stat))
+
+
+class LUXCORE_IMAGE_PT_export_profile(Panel, LuxCoreImagePanel):
+    bl_label = "Export Profile"
+    bl_parent_id = "LUXCORE_IMAGE_PT_statistics"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        image = context.space_data.image
+        statistics_collection = context.scene.luxcore.statistics
+        profile = statistics_collection[image.render_slots.active_index].export_profile
+
+        row = layout.row(align=True)
+        row.prop(statistics_collection, "profile_sort_by", text="")
+        row.prop(statistics_collection, "profile_count")
+
+        if profile is None:
+            layout.label(text="Only available after a final render", icon=icons.INFO)
+        else:
+            count = statistics_collection.profile_count
+            objects = profile.get_heaviest_objects(statistics_collection.profile_sort_by, count)
+            self.draw_table(layout, ("Object", "Time", "Triangles", "Strands", "Memory"),
+                            [(p.name, time_to_string(p.export_time), triangle_count_to_string(p.triangle_count),
+                              triangle_count_to_string(p.strand_count), "%.1f MiB" % (p.memory / (1024 * 1024)))
+                             for p in objects])
+
+            materials = profile.get_slowest_materials(count)
+            self.draw_table(layout, ("Material", "Time", "Conversions"),
+                            [(p.name, time_to_string(p.export_time), str(p.conversion_count))
+                             for p in materials])
+
+        col = layout.column(align=True)
+        col.prop(statistics_collection, "save_export_profile")
+        sub = col.column(align=True)
+        sub.active = statistics_collection.save_export_profile
+        sub.prop(statistics_collection, "export_profile_filepath")
+
+    @staticmethod
+    def draw_table(layout, headers, rows):
+        box = layout.box()
+        split = box.split(factor=0.35)
+        columns = [split.column()]
+        split = split.split()
+        columns += [split.column() for _ in headers[1:]]
+
+        for col, header in zip(columns, headers):
+            col.label(text=header)
+        for row in rows:
+            for col, text in zip(columns, row):
+                col.label(text=text)
@@ -320,3 +320,100 @@ class LUXCORE_RENDER_PT_caches_DLSC_persistence(RenderButtonsPanel, Panel):
 
     def draw(self, context):
         draw_persistent_file_ui(context, self.layout, context.scene.luxcore.config.dls_cache)
+
+
+class LUXCORE_RENDER_PT_caches_geometry(RenderButtonsPanel, Panel):
+    COMPAT_ENGINES = {"LUXCORE"}
+    bl_label = "Geometry Cache"
+    bl_parent_id = "LUXCORE_RENDER_PT_caches"
+    lux_predecessor = "LUXCORE_RENDER_PT_caches_DLSC"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.render.engine == "LUXCORE"
+
+    def draw_header(self, context):
+        self.layout.prop(context.scene.luxcore.config.geometry_cache, "enabled", text="")
+
+    def draw(self, context):
+        geometry_cache = context.scene.luxcore.config.geometry_cache
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+
+        col = layout.column(align=True)
+        col.active = geometry_cache.enabled
+        col.prop(geometry_cache, "directory")
+        col.prop(geometry_cache, "max_size")
+
+
+class LUXCORE_RENDER_PT_caches_hair(RenderButtonsPanel, Panel):
+    COMPAT_ENGINES = {"LUXCORE"}
+    bl_label = "Hair Cache"
+    bl_parent_id = "LUXCORE_RENDER_PT_caches"
+    lux_predecessor = "LUXCORE_RENDER_PT_caches_geometry"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.render.engine == "LUXCORE"
+
+    def draw_header(self, context):
+        self.layout.prop(context.scene.luxcore.config.hair_cache, "enabled", text="")
+
+    def draw(self, context):
+        hair_cache = context.scene.luxcore.config.hair_cache
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+
+        col = layout.column(align=True)
+        col.active = hair_cache.enabled
+        col.prop(hair_cache, "max_size")
+
+
+class LUXCORE_RENDER_PT_caches_image(RenderButtonsPanel, Panel):
+    COMPAT_ENGINES = {"LUXCORE"}
+    bl_label = "Packed Image Cache"
+    bl_parent_id = "LUXCORE_RENDER_PT_caches"
+    lux_predecessor = "LUXCORE_RENDER_PT_caches_hair"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.render.engine == "LUXCORE"
+
+    def draw_header(self, context):
+        self.layout.prop(context.scene.luxcore.config.image_cache, "enabled", text="")
+
+    def draw(self, context):
+        image_cache = context.scene.luxcore.config.image_cache
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+
+        col = layout.column(align=True)
+        col.active = image_cache.enabled
+        col.prop(image_cache, "directory")
+        col.prop(image_cache, "max_size")
+
+
+class LUXCORE_RENDER_PT_caches_mesh_deduplication(RenderButtonsPanel, Panel):
+    COMPAT_ENGINES = {"LUXCORE"}
+    bl_label = "Mesh Deduplication"
+    bl_parent_id = "LUXCORE_RENDER_PT_caches"
+    lux_predecessor = "LUXCORE_RENDER_PT_caches_image"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.render.engine == "LUXCORE"
+
+    def draw_header(self, context):
+        self.layout.prop(context.scene.luxcore.config, "deduplicate_meshes", text="")
+
+    def draw(self, context):
+        layout = self.layout
+        layout.active = context.scene.luxcore.config.deduplicate_meshes
+        layout.label(text="Only used in final renders", icon=icons.INFO)
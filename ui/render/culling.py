@@ -0,0 +1,31 @@
+from bl_ui.properties_render import RenderButtonsPanel
+from bpy.types import Panel
+from .. import icons
+
+
+class LUXCORE_RENDER_PT_frustum_culling(RenderButtonsPanel, Panel):
+    COMPAT_ENGINES = {"LUXCORE"}
+    bl_label = "Frustum Culling"
+    bl_options = {'DEFAULT_CLOSED'}
+    bl_order = 72
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.render.engine == "LUXCORE"
+
+    def draw_header(self, context):
+        self.layout.prop(context.scene.luxcore.config.frustum_culling, "enabled", text="")
+
+    def draw(self, context):
+        frustum_culling = context.scene.luxcore.config.frustum_culling
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+        layout.active = frustum_culling.enabled
+
+        layout.prop(frustum_culling, "margin")
+
+        camera = context.scene.camera
+        if camera and camera.type == "CAMERA" and camera.data.type not in {"PERSP", "ORTHO"}:
+            layout.label(text="Not supported for panoramic cameras", icon=icons.INFO)
+        layout.label(text="Only used in final renders", icon=icons.INFO)
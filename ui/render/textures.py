@@ -0,0 +1,50 @@
+from bl_ui.properties_render import RenderButtonsPanel
+from bpy.types import Panel
+
+
+class LUXCORE_RENDER_PT_textures(RenderButtonsPanel, Panel):
+    COMPAT_ENGINES = {"LUXCORE"}
+    bl_label = "Textures"
+    bl_options = {'DEFAULT_CLOSED'}
+    bl_order = 75
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.render.engine == "LUXCORE"
+
+    def draw(self, context):
+        config = context.scene.luxcore.config
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+
+        layout.prop(config, "imagemap_storage")
+
+
+class LUXCORE_RENDER_PT_textures_budget(RenderButtonsPanel, Panel):
+    COMPAT_ENGINES = {"LUXCORE"}
+    bl_label = "Memory Budget"
+    bl_parent_id = "LUXCORE_RENDER_PT_textures"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.render.engine == "LUXCORE"
+
+    def draw_header(self, context):
+        self.layout.prop(context.scene.luxcore.config.texture_budget, "enabled", text="")
+
+    def draw(self, context):
+        texture_budget = context.scene.luxcore.config.texture_budget
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+        layout.active = texture_budget.enabled
+
+        col = layout.column(align=True)
+        col.prop(texture_budget, "max_memory")
+        col.prop(texture_budget, "viewport_max_memory")
+
+        col = layout.column(align=True)
+        col.prop(texture_budget, "directory")
+        col.prop(texture_budget, "max_size")
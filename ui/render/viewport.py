@@ -28,6 +28,18 @@ class LUXCORE_RENDER_PT_viewport_settings(RenderButtonsPanel, Panel):
         layout.prop(viewport, "halt_time")
         layout.prop(viewport, "denoise")
 
+        col = layout.column()
+        col.active = viewport.denoise
+        col.prop(viewport, "periodic_denoise")
+        col = col.column(align=True)
+        col.active = viewport.denoise and viewport.periodic_denoise
+        col.prop(viewport, "denoise_cadence")
+        if viewport.denoise_cadence == "SAMPLES":
+            col.prop(viewport, "denoise_interval_samples")
+        else:
+            col.prop(viewport, "denoise_interval_time")
+        col.prop(viewport, "denoise_max_time_share")
+
         if luxcore_engine == "PATH" and not config.use_tiles and config.path.hybridbackforward_enable:
             layout.prop(viewport, "add_light_tracing")
 
@@ -68,3 +80,6 @@ class LUXCORE_RENDER_PT_viewport_settings_advanced(RenderButtonsPanel, Panel):
         col = layout.column(align=True)
         col.enabled = viewport.pixel_size != "1"
         col.prop(viewport, "mag_filter")
+
+        col = layout.column(align=True)
+        col.prop(viewport, "use_half_float")
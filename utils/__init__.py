@@ -92,15 +92,23 @@ def persistent_id_to_str(persistent_id):
 
 
 def make_object_id(dg_obj_instance):
-    chosen_id = dg_obj_instance.object.original.luxcore.id
-    if chosen_id != -1:
-        return chosen_id
-
     if dg_obj_instance.is_instance:
+        chosen_id = dg_obj_instance.object.original.luxcore.id
+        if chosen_id != -1:
+            return chosen_id
         # random_id seems to be a 4-Byte integer in range -0xffffffff to 0xffffffff.
         return dg_obj_instance.random_id & 0xfffffffe
 
-    key = dg_obj_instance.object.original.name
+    return make_object_id_from_obj(dg_obj_instance.object)
+
+
+def make_object_id_from_obj(obj):
+    """ Same as make_object_id(), for objects that are not instances """
+    chosen_id = obj.original.luxcore.id
+    if chosen_id != -1:
+        return chosen_id
+
+    key = obj.original.name
 
     # We do this similar to Cycles: hash the object's name to get an ID that's stable over
     # frames and between re-renders (as long as the object is not renamed).
@@ -365,6 +373,11 @@ def is_obj_visible_in_cycles(obj):
 
 def visible_to_camera(dg_obj_instance, is_viewport_render, view_layer=None):
     obj = dg_obj_instance.parent if dg_obj_instance.is_instance else dg_obj_instance.object
+    return obj_visible_to_camera(obj, is_viewport_render, view_layer)
+
+
+def obj_visible_to_camera(obj, is_viewport_render, view_layer=None):
+    """ Same as visible_to_camera(), for objects that are not instances """
     if not obj.luxcore.visible_to_camera:
         return False
     if is_viewport_render:
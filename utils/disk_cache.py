@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+class DiskCache:
+    """
+    A directory on disk that stores cache entries, limited to a maximum size.
+    Each entry is a subdirectory named after its key (e.g. a content hash) and can contain any number of files.
+    When the size limit is exceeded, the least recently used entries are deleted. The modification time
+    of an entry directory is used to track its last use, so the order survives Blender restarts.
+    """
+    # Prefix of entries that are still being written, they are ignored by get() and by the size limit
+    TEMP_PREFIX = ".tmp_"
+
+    def __init__(self, dirpath, max_size):
+        self.dirpath = dirpath
+        # In bytes
+        self.max_size = max_size
+
+    def get(self, key):
+        """
+        Returns the path to the directory of the entry, or None if the key is not in the cache.
+        """
+        path = os.path.join(self.dirpath, key)
+        if not os.path.isdir(path):
+            return None
+
+        try:
+            # Mark as recently used
+            os.utime(path)
+        except OSError:
+            # Entry was deleted in the meantime (e.g. by another Blender instance)
+            return None
+        return path
+
+    @contextmanager
+    def new_entry(self, key):
+        """
+        Yields a temporary directory where the files of a new entry can be written.
+        The entry becomes visible under its key only if the block finishes without exception,
+        so a cancelled or failed write never leaves an incomplete entry in the cache.
+
+        Use it like this:
+
+        with disk_cache.new_entry(key) as dirpath:
+            save_files_to(dirpath)
+        """
+        os.makedirs(self.dirpath, exist_ok=True)
+        temp_dirpath = tempfile.mkdtemp(prefix=self.TEMP_PREFIX, dir=self.dirpath)
+
+        try:
+            yield temp_dirpath
+            try:
+                os.replace(temp_dirpath, os.path.join(self.dirpath, key))
+            except OSError:
+                # The entry already exists (e.g. written by another Blender instance in the meantime)
+                pass
+        finally:
+            if os.path.isdir(temp_dirpath):
+                shutil.rmtree(temp_dirpath, ignore_errors=True)
+
+    def enforce_size_limit(self, keep=()):
+        """
+        Delete the least recently used entries until the cache is smaller than the size limit.
+        keep: Keys of entries that must not be deleted (e.g. because they are still in use)
+        """
+        if not os.path.isdir(self.dirpath):
+            return
+
+        entries = []
+        total_size = 0
+
+        for name in os.listdir(self.dirpath):
+            if name.startswith(self.TEMP_PREFIX):
+                continue
+            path = os.path.join(self.dirpath, name)
+            try:
+                size = _get_dir_size(path)
+                if name not in keep:
+                    entries.append((os.path.getmtime(path), size, path))
+            except OSError:
+                continue
+            # Kept entries count towards the limit, but only other entries are deleted
+            total_size += size
+
+        if total_size <= self.max_size:
+            return
+
+        # Oldest entries first
+        entries.sort()
+
+        for mtime, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+    def clear(self):
+        if os.path.isdir(self.dirpath):
+            shutil.rmtree(self.dirpath, ignore_errors=True)
+
+
+def _get_dir_size(dirpath):
+    if not os.path.isdir(dirpath):
+        return os.path.getsize(dirpath)
+    return sum(entry.stat().st_size for entry in os.scandir(dirpath) if entry.is_file())
@@ -0,0 +1,81 @@
+"""
+Caches the resolved files of image sequences, because they are needed by every imagemap
+with a sequence on every export and every frame, and sequences are often stored in large
+directories on network drives.
+The index is keyed by directory, filename stem and the number of digits of the frame number,
+so all images using the same sequence share one entry. Entries are invalidated when the modification time of the directory changes.
+"""
+import os
+from string import digits
+from . import get_abspath, image_sequence_resolve_all
+
+# {(basedir, filename stem, digit count, extension): (directory state, [(index, filepath), ...])}
+_sequences = {}
+# Keys of the entries whose directory was checked since the last call of revalidate()
+_validated = set()
+
+
+def _get_state(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _make_key(image):
+    filepath = get_abspath(image.filepath, image.library)
+    basedir, filename = os.path.split(filepath)
+    filename_noext, ext = os.path.splitext(filename)
+    filename_nodigits = filename_noext.rstrip(digits)
+    # Without the digit count, a single image like "frame.png" would share the entry of "frame0001.png"
+    return basedir, filename_nodigits, len(filename_noext) - len(filename_nodigits), ext
+
+
+def get_sequence(image):
+    """
+    Same as utils.image_sequence_resolve_all(), but only scans the directory if it changed.
+    The directory is checked at most once between two calls of revalidate().
+    The returned list must not be modified.
+    """
+    key = _make_key(image)
+    entry = _sequences.get(key)
+
+    if entry and key in _validated:
+        return entry[1]
+
+    state = _get_state(key[0])
+    if not entry or not state or entry[0] != state:
+        indexed_filepaths = image_sequence_resolve_all(image)
+        if not state:
+            return indexed_filepaths
+        entry = (state, indexed_filepaths)
+        _sequences[key] = entry
+
+    _validated.add(key)
+    return entry[1]
+
+
+def get_filepath(image, frame):
+    """
+    Returns the filepath of a frame in the sequence (frame numbering starts at 1),
+    raises an IndexError if the frame does not exist.
+    """
+    indexed_filepaths = get_sequence(image)
+    if frame < 1:
+        raise IndexError
+    index, filepath = indexed_filepaths[frame - 1]
+    return filepath
+
+
+def revalidate():
+    """
+    Check the directories of all sequences again when they are used the next time.
+    Called on frame change and before each export.
+    """
+    _validated.clear()
+
+
+def clear():
+    _sequences.clear()
+    _validated.clear()
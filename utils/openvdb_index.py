@@ -0,0 +1,168 @@
+"""
+Caches file system lookups for OpenVDB files, because they are needed for every OpenVDB
+grid on every frame, and the files are often stored in large directories on network drives.
+Entries are invalidated when the modification time of the directory or file changes.
+The cache is shared by all nodes, grids and frames. The least recently used entries are
+deleted when a cache grows too large (e.g. during long sequences).
+
+The grid info of the next frame is prefetched by a single worker thread. It only calls
+pyluxcore.GetOpenVDBGridInfo(), which reads the file and does not use any LuxCore scene
+or session. The OpenVDB functions of pyluxcore are never called from two threads at once.
+"""
+import os
+import copy
+import queue
+import threading
+from collections import OrderedDict
+from ..bin import pyluxcore
+from . import get_abspath, openVDB_sequence_resolve_all
+
+# Maximum number of entries of each cache
+MAX_ENTRIES = 512
+
+_lock = threading.Lock()
+# Held while an OpenVDB function of pyluxcore is called, by the main thread or by the prefetch worker
+_pyluxcore_lock = threading.Lock()
+# {filepath: (directory state, [(index, filepath), ...])}
+_sequences = OrderedDict()
+# {filepath: (file state, grid names)}
+_grid_names = OrderedDict()
+# {(filepath, grid name): (file state, grid info)}
+_grid_infos = OrderedDict()
+# Files whose grid info is queued or currently read by the prefetch worker
+_prefetching = set()
+# (filepath, grid names) to prefetch
+_prefetch_queue = queue.Queue()
+_prefetch_worker = None
+
+
+def _get_state(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get(cache, key):
+    """ Has to be called with the lock held """
+    entry = cache.get(key)
+    if entry:
+        cache.move_to_end(key)
+    return entry
+
+
+def _get_valid(cache, key, state):
+    """ Returns the cached value, or None if there is none or the file (or directory) has changed """
+    with _lock:
+        entry = _get(cache, key)
+    if entry and state and entry[0] == state:
+        return entry[1]
+    return None
+
+
+def _put(cache, key, entry):
+    """ Has to be called with the lock held """
+    cache[key] = entry
+    cache.move_to_end(key)
+    while len(cache) > MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+def resolve_sequence(file):
+    """ Same as utils.openVDB_sequence_resolve_all(), but only scans the directory if it changed """
+    filepath = get_abspath(file)
+    state = _get_state(os.path.dirname(filepath))
+
+    with _lock:
+        entry = _get(_sequences, filepath)
+    if entry and state and entry[0] == state:
+        return entry[1]
+
+    indexed_filepaths = openVDB_sequence_resolve_all(file)
+    if state:
+        with _lock:
+            _put(_sequences, filepath, (state, indexed_filepaths))
+    return indexed_filepaths
+
+
+def get_grid_names(filepath):
+    """ Same as pyluxcore.GetOpenVDBGridNames() """
+    state = _get_state(filepath)
+
+    names = _get_valid(_grid_names, filepath, state)
+    if names is None:
+        with _pyluxcore_lock:
+            names = pyluxcore.GetOpenVDBGridNames(filepath)
+        if state:
+            with _lock:
+                _put(_grid_names, filepath, (state, list(names)))
+    return list(names)
+
+
+def get_grid_info(filepath, grid_name):
+    """
+    Same as pyluxcore.GetOpenVDBGridInfo().
+    Returns a copy, so the caller may modify the returned lists.
+    """
+    key = (filepath, grid_name)
+    state = _get_state(filepath)
+
+    info = _get_valid(_grid_infos, key, state)
+    if info is None:
+        with _pyluxcore_lock:
+            # The prefetch worker might have read it while we were waiting for the lock
+            info = _get_valid(_grid_infos, key, state)
+            if info is None:
+                info = pyluxcore.GetOpenVDBGridInfo(filepath, grid_name)
+                if state:
+                    with _lock:
+                        _put(_grid_infos, key, (state, info))
+    return copy.deepcopy(info)
+
+
+def prefetch_grid_info(filepath, grid_names):
+    """
+    Read the grid info of a file in the prefetch worker thread, so it is already
+    cached when it is needed (e.g. the file of the next frame of an animation).
+    """
+    global _prefetch_worker
+
+    with _lock:
+        if filepath in _prefetching:
+            return
+        _prefetching.add(filepath)
+
+        if _prefetch_worker is None or not _prefetch_worker.is_alive():
+            _prefetch_worker = threading.Thread(target=_run_prefetch_worker, name="LuxCoreOpenVDBPrefetch",
+                                                daemon=True)
+            _prefetch_worker.start()
+
+    _prefetch_queue.put((filepath, tuple(grid_names)))
+
+
+def _run_prefetch_worker():
+    while True:
+        filepath, grid_names = _prefetch_queue.get()
+        _prefetch(filepath, grid_names)
+
+
+def _prefetch(filepath, grid_names):
+    try:
+        if not os.path.isfile(filepath):
+            return
+        for grid_name in grid_names:
+            get_grid_info(filepath, grid_name)
+    except (OSError, RuntimeError) as error:
+        print("Could not prefetch OpenVDB grid info of %s: %s" % (filepath, error))
+    finally:
+        with _lock:
+            _prefetching.discard(filepath)
+
+
+def clear():
+    """ Called when a .blend file is loaded """
+    with _lock:
+        _sequences.clear()
+        _grid_names.clear()
+        _grid_infos.clear()
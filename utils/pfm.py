@@ -16,26 +16,7 @@ def load_pfm(file, as_flat_list=False):
     with open(r"path/to/file.pfm", "rb") as f:
         data, scale = load_pfm(f)
     """
-    header = file.readline().decode("utf-8").rstrip()
-    if header == "PF":
-        color = True
-    elif header == "Pf":
-        color = False
-    else:
-        raise Exception("Not a PFM file.")
-
-    dim_match = re.match(r"^(\d+)\s(\d+)\s$", file.readline().decode("utf-8"))
-    if dim_match:
-        width, height = map(int, dim_match.groups())
-    else:
-        raise Exception("Malformed PFM header.")
-
-    scale = float(file.readline().decode("utf-8").rstrip())
-    if scale < 0:  # little-endian
-        endian = "<"
-        scale = -scale
-    else:
-        endian = ">"  # big-endian
+    color, width, height, scale, endian = _read_header(file)
 
     data = np.fromfile(file, endian + "f")
     shape = (height, width, 3) if color else (height, width)
@@ -64,14 +45,114 @@ def save_pfm(file, image, scale=1):
     else:
         raise Exception("Image must have H x W x 3, H x W x 1 or H x W dimensions.")
 
-    file.write(b"PF\n" if color else b"Pf\n")
-    file.write(b"%d %d\n" % (image.shape[1], image.shape[0]))
-
     endian = image.dtype.byteorder
-
     if endian == "<" or endian == "=" and sys.byteorder == "little":
+        endian = "<"
+    else:
+        endian = ">"
+
+    _write_header(file, image.shape[1], image.shape[0], color, scale, endian)
+    image.tofile(file)
+
+
+def load_pfm_memmap(filepath, rows=None, mode="r"):
+    """
+    Map a PFM file into memory instead of reading it. The returned array is a view
+    of the file, pages are only loaded when they are accessed.
+    rows: Optional (start, stop) tuple to map only a range of rows
+    mode: "r" for read-only access, "r+" to modify the file through the array
+    Returns a tuple containing the array (H x W x 3 or H x W) and the scale factor from the file.
+
+    Usage:
+    data, scale = load_pfm_memmap(r"path/to/file.pfm", rows=(0, 512))
+    """
+    with open(filepath, "rb") as file:
+        color, width, height, scale, endian = _read_header(file)
+        header_size = file.tell()
+
+    start, stop = rows if rows else (0, height)
+    if not 0 <= start < stop <= height:
+        raise Exception("Invalid row range %d - %d (image has %d rows)." % (start, stop, height))
+
+    channels = 3 if color else 1
+    row_size = width * channels * 4
+    shape = (stop - start, width, 3) if color else (stop - start, width)
+    data = np.memmap(filepath, dtype=endian + "f", mode=mode,
+                     offset=header_size + start * row_size, shape=shape)
+    return data, scale
+
+
+def create_pfm_memmap(filepath, width, height, color=True, scale=1):
+    """
+    Create a PFM file and return a writable array (H x W x 3 or H x W) that is mapped to its pixels,
+    so the image can be written directly into the file (e.g. by pyluxcore's GetOutputFloat()).
+    Call flush() on the array or delete it to make sure the data is written.
+    """
+    with open(filepath, "wb") as file:
+        _write_header(file, width, height, color, scale, "<")
+        header_size = file.tell()
+
+    shape = (height, width, 3) if color else (height, width)
+    return np.memmap(filepath, dtype="<f", mode="r+", offset=header_size, shape=shape)
+
+
+def save_pfm_memmap(filepath, image, scale=1):
+    """
+    Save a Numpy array to a PFM file through a memory map. The image does not have to be
+    contiguous, strided views (e.g. image[:, :, :3] of an RGBA image) are written without
+    an intermediate copy.
+
+    Usage:
+    save_pfm_memmap(r"/path/to/out.pfm", rgba[:, :, :3])
+    """
+    if image.dtype.name != "float32":
+        raise Exception("Image dtype must be float32 (got %s)" % image.dtype.name)
+
+    if len(image.shape) == 3 and image.shape[2] == 3:  # color image
+        color = True
+    elif len(image.shape) == 2 or len(image.shape) == 3 and image.shape[2] == 1:  # greyscale
+        color = False
+    else:
+        raise Exception("Image must have H x W x 3, H x W x 1 or H x W dimensions.")
+
+    height, width = image.shape[:2]
+    data = create_pfm_memmap(filepath, width, height, color, scale)
+    np.copyto(data, image if color else image.reshape(height, width))
+    data.flush()
+    del data
+
+
+def _read_header(file):
+    """ Returns a tuple (color, width, height, scale, endian), the file is positioned after the header """
+    header = file.readline().decode("utf-8").rstrip()
+    if header == "PF":
+        color = True
+    elif header == "Pf":
+        color = False
+    else:
+        raise Exception("Not a PFM file.")
+
+    dim_match = re.match(r"^(\d+)\s(\d+)\s$", file.readline().decode("utf-8"))
+    if dim_match:
+        width, height = map(int, dim_match.groups())
+    else:
+        raise Exception("Malformed PFM header.")
+
+    scale = float(file.readline().decode("utf-8").rstrip())
+    if scale < 0:  # little-endian
+        endian = "<"
         scale = -scale
+    else:
+        endian = ">"  # big-endian
 
-    file.write(b"%f\n" % scale)
+    return color, width, height, scale, endian
 
-    image.tofile(file)
+
+def _write_header(file, width, height, color, scale, endian):
+    file.write(b"PF\n" if color else b"Pf\n")
+    file.write(b"%d %d\n" % (width, height))
+
+    if endian == "<":
+        scale = -scale
+
+    file.write(b"%f\n" % scale)